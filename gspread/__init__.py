@@ -19,8 +19,14 @@ except ImportError:
 
 
 from .client import Client, login, authorize
-from .models import Spreadsheet, Worksheet, Cell
+from .models import Spreadsheet, Worksheet, Cell, CellIndex, UpdateResult
 from .exceptions import (GSpreadException, AuthenticationError,
                          SpreadsheetNotFound, NoValidUrlKeyFound,
                          IncorrectCellLabel, WorksheetNotFound,
                          UpdateCellError, RequestError, CellNotFound)
+
+try:
+    from .asyncclient import AsyncClient
+except SyntaxError:
+    # asyncio support requires Python 3.6+
+    pass
@@ -0,0 +1,1151 @@
+# -*- coding: utf-8 -*-
+
+"""
+gspread.asyncclient
+~~~~~~~~~~~~~~~~~~~
+
+This module contains asyncio counterparts of the Client, Spreadsheet and
+Worksheet classes. It requires Python 3.6+ and the aiohttp library.
+
+"""
+import asyncio
+from collections import deque
+from operator import attrgetter
+
+from xml.etree import ElementTree
+
+from .client import (Client, _SpreadsheetsCache, _SpreadsheetsPages,
+                     _filter_entries, _url_key)
+from .exceptions import (AuthenticationError, SpreadsheetNotFound,
+                         WorksheetNotFound, CellNotFound, UpdateCellError,
+                         RequestError, HTTPError)
+from .httpsession import _prepare_request, _clock
+from .models import (Spreadsheet, Worksheet, Cell, CellIndex, UpdateResult,
+                     _bounds, _in_bounds, _iter_rows, _pad_rows, _records,
+                     _matcher, _collect_columns, _record_value,
+                     _BOUNDS_PARAMS)
+from .ns import _ns, _ns1
+from .urls import construct_url
+from .utils import finditem
+
+
+async def _aiter_feed_entries(response):
+    """Incrementally parses a streamed feed response, yielding its entries.
+
+    Every entry is dropped from the tree as soon as the generator resumes.
+    """
+    entry_tag = _ns('entry')
+    parser = ElementTree.XMLPullParser(events=('start', 'end'))
+
+    try:
+        root = None
+        async for chunk in response.iter_chunks():
+            parser.feed(chunk)
+            for event, elem in parser.read_events():
+                if root is None:
+                    root = elem
+                elif event == 'end' and elem.tag == entry_tag:
+                    yield elem
+                    root.clear()
+        parser.close()
+    finally:
+        response.close()
+
+
+async def _aiter_rows(cells, first_row=1, first_col=1,
+                      value=attrgetter('value')):
+    """Groups cells ordered by rows, read from the asynchronous iterator
+    `cells`, into lists of values, as :func:`gspread.models._iter_rows`
+    does.
+
+    """
+    current, pending = first_row, []
+
+    async for cell in cells:
+        if pending and cell.row != pending[-1].row:
+            # the feed is ordered by rows, so the pending row is complete
+            for row in _iter_rows(pending, current, first_col, value):
+                yield row
+            current, pending = pending[-1].row + 1, []
+        pending.append(cell)
+
+    for row in _iter_rows(pending, current, first_col, value):
+        yield row
+
+
+class AsyncResponse(object):
+
+    """A response of :class:`AsyncHTTPSession`. Its body is read into
+    `content`, unless the request was streamed, in which case it's read
+    with :meth:`iter_chunks`.
+
+    """
+
+    def __init__(self, status_code, headers, content, raw=None):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self._raw = raw
+
+    async def iter_chunks(self, size=65536):
+        """Yields the response body in chunks of at most `size` bytes."""
+        if self._raw is None:
+            if self.content:
+                yield self.content
+            return
+
+        async for chunk in self._raw.content.iter_chunked(size):
+            yield chunk
+
+    def close(self):
+        """Releases the connection of a streamed response."""
+        if self._raw is not None:
+            self._raw.release()
+            self._raw = None
+
+
+class AsyncHTTPSession(object):
+
+    """Handles HTTP activity on an asyncio event loop while keeping headers
+       persisting across requests.
+
+       :param headers: A dict with initial headers.
+       :param pool_maxsize: (optional) Maximum number of connections open
+                            at the same time.
+       :param connect_timeout: (optional) Seconds to wait for a connection
+                               to be established. Waits forever by default.
+       :param read_timeout: (optional) Seconds to wait for the server to
+                            send data. Waits forever by default.
+       :param retry_policy: (optional) A
+                            :class:`~gspread.httpsession.RetryPolicy`
+                            applied to every request.
+       :param rate_limiter: (optional) A
+                            :class:`~gspread.httpsession.RateLimiter`
+                            awaited before every request, retries included.
+    """
+
+    def __init__(self, headers=None, pool_maxsize=100, connect_timeout=None,
+                 read_timeout=None, retry_policy=None, rate_limiter=None):
+        import aiohttp
+
+        self.headers = headers or {}
+        self.retry_policy = retry_policy
+        self.rate_limiter = rate_limiter
+        self._aiohttp = aiohttp
+        # older aiohttp versions raise ServerTimeoutError for both connect
+        # and read timeouts, so only the newer error tells them apart
+        self._connect_timeout_error = getattr(aiohttp,
+                                              'ConnectionTimeoutError', ())
+        self._pool_maxsize = pool_maxsize
+        self._timeout = aiohttp.ClientTimeout(connect=connect_timeout,
+                                              sock_read=read_timeout)
+        self._session = None
+
+    def _client_session(self):
+        # aiohttp sessions have to be created inside the running event loop
+        if self._session is None:
+            connector = self._aiohttp.TCPConnector(limit=self._pool_maxsize)
+            self._session = self._aiohttp.ClientSession(
+                connector=connector, timeout=self._timeout)
+        return self._session
+
+    async def _send(self, session, method, url, data, headers, stream):
+        r = await session.request(method, url, data=data, headers=headers)
+        if stream and r.status < 400:
+            return AsyncResponse(r.status, r.headers, None, raw=r)
+
+        try:
+            return AsyncResponse(r.status, r.headers, await r.read())
+        finally:
+            r.release()
+
+    async def request(self, method, url, data=None, headers=None,
+                      stream=False, idempotent=None):
+        data, request_headers = _prepare_request(self.headers, data, headers)
+        session = self._client_session()
+
+        retry = self.retry_policy
+        if retry is not None and idempotent is None:
+            idempotent = retry.is_idempotent(method)
+
+        attempt = 0
+        while True:
+            attempt += 1
+
+            if self.rate_limiter is not None:
+                await asyncio.sleep(self.rate_limiter.reserve())
+
+            try:
+                response = await self._send(session, method, url, data,
+                                            request_headers, stream)
+            except (self._aiohttp.ClientError, asyncio.TimeoutError) as ex:
+                # a request that timed out connecting was never sent, so
+                # it can be repeated whatever its method
+                safe = idempotent or isinstance(
+                    ex, self._connect_timeout_error)
+                if retry is None or not retry.should_retry(
+                        attempt, safe, error=ex):
+                    raise
+                await asyncio.sleep(retry.backoff(attempt))
+                continue
+
+            if response.status_code > 399:
+                if retry is not None and retry.should_retry(
+                        attempt, idempotent, response.status_code):
+                    await asyncio.sleep(retry.backoff(attempt, response))
+                    continue
+
+                raise HTTPError(response.status_code, "{}: {}".format(
+                    response.status_code, response.content))
+
+            return response
+
+    async def get(self, url, **kwargs):
+        return await self.request('GET', url, **kwargs)
+
+    async def delete(self, url, **kwargs):
+        return await self.request('DELETE', url, **kwargs)
+
+    async def post(self, url, data=None, headers=None, **kwargs):
+        return await self.request('POST', url, data=data, headers=headers,
+                                  **kwargs)
+
+    async def put(self, url, data=None, **kwargs):
+        return await self.request('PUT', url, data=data, **kwargs)
+
+    def add_header(self, name, value):
+        self.headers[name] = value
+
+    async def close(self):
+        """Closes all open connections."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+class AsyncClient(Client):
+
+    """An asyncio variant of :class:`~gspread.Client`.
+
+    Methods sending requests are coroutines, and spreadsheets and
+    worksheets it opens are :class:`AsyncSpreadsheet` and
+    :class:`AsyncWorksheet` instances. Many requests can be awaited
+    concurrently on a single event loop.
+
+    :param auth: An OAuth2 credential object. ClientLogin isn't supported.
+    :param http_session: (optional) A session object capable of making
+                         HTTP requests on an event loop. Defaults to
+                         :class:`AsyncHTTPSession`.
+    :param retry_policy: (optional) A
+                         :class:`~gspread.httpsession.RetryPolicy`.
+    :param rate_limiter: (optional) A
+                         :class:`~gspread.httpsession.RateLimiter`
+                         awaited before every request.
+    :param metadata_ttl: (optional) Number of seconds the spreadsheets feed
+                         is kept for opening spreadsheets by title or key.
+                         0 disables caching.
+
+    >>> c = gspread.AsyncClient(auth=OAuthCredentialObject)
+    >>> c.login()
+    >>> sh = await c.open_by_key('0BmgG6nO_6dprdS1MN3d3MkdPa142WFRrdnRRUWl1UFE')
+    >>> values = await asyncio.gather(*[ws.get_all_values()
+    ...                                 for ws in await sh.worksheets()])
+
+    """
+
+    def __init__(self, auth, http_session=None, retry_policy=None,
+                 rate_limiter=None, metadata_ttl=60):
+        super(AsyncClient, self).__init__(
+            auth, http_session=http_session or AsyncHTTPSession(),
+            retry_policy=retry_policy, rate_limiter=rate_limiter,
+            metadata_ttl=metadata_ttl)
+
+    def login(self):
+        """Authorize client using OAuth2 credentials.
+
+        :raises AuthenticationError: if `auth` isn't an OAuth2 credential.
+
+        """
+        if not hasattr(self.auth, 'access_token'):
+            raise AuthenticationError(
+                "AsyncClient supports OAuth2 credentials only")
+
+        super(AsyncClient, self).login()
+
+    async def open(self, title):
+        """Opens a spreadsheet, returning an :class:`AsyncSpreadsheet`.
+
+        :param title: A title of a spreadsheet.
+
+        :raises gspread.SpreadsheetNotFound: if no spreadsheet with
+                                             specified `title` is found.
+
+        """
+        elem = await self._find_entry('by_title', title)
+        if elem is None:
+            raise SpreadsheetNotFound
+
+        return AsyncSpreadsheet(self, elem)
+
+    async def open_by_key(self, key):
+        """Opens a spreadsheet specified by `key`, returning an
+        :class:`AsyncSpreadsheet`.
+
+        :param key: A key of a spreadsheet as it appears in a URL in a browser.
+
+        :raises gspread.SpreadsheetNotFound: if no spreadsheet with
+                                             specified `key` is found.
+
+        """
+        cache = self._cached_spreadsheets()
+        elem = cache.by_key.get(key) if cache is not None else None
+
+        if elem is None:
+            try:
+                elem = await self.get_feed(construct_url('spreadsheet',
+                                                         spreadsheet_id=key))
+            except HTTPError:
+                elem = await self._find_entry('by_key', key)
+                if elem is None:
+                    raise SpreadsheetNotFound
+            else:
+                if cache is not None:
+                    cache.by_key[key] = elem
+
+        return AsyncSpreadsheet(self, elem)
+
+    async def open_by_url(self, url):
+        """Opens a spreadsheet specified by `url`, returning an
+        :class:`AsyncSpreadsheet`.
+
+        :param url: URL of a spreadsheet as it appears in a browser.
+
+        :raises gspread.SpreadsheetNotFound: if no spreadsheet with
+                                             specified `url` is found.
+
+        """
+        return await self.open_by_key(_url_key(url))
+
+    async def openall(self, title=None):
+        """Opens all available spreadsheets, returning a list of
+        :class:`AsyncSpreadsheet` instances.
+
+        :param title: (optional) If specified can be used to filter
+                      spreadsheets by title.
+
+        """
+        cache = self._cached_spreadsheets() or await self.refresh()
+
+        return [AsyncSpreadsheet(self, elem)
+                for elem in _filter_entries(cache.feed, title=title)]
+
+    async def iter_spreadsheets(self, title=None, page_size=100):
+        """Yields :class:`AsyncSpreadsheet` instances for all available
+        spreadsheets, fetching the spreadsheets feed a page at a time, as
+        :meth:`gspread.Client.iter_spreadsheets` does.
+
+        :param title: (optional) If specified only spreadsheets with this
+                      exact title are yielded.
+        :param page_size: (optional) Number of spreadsheets requested at
+                          once.
+
+        >>> async for sh in c.iter_spreadsheets(page_size=50):
+        ...     print(sh.title)
+
+        """
+        pages = _SpreadsheetsPages(title, page_size)
+        url = pages.first_url()
+
+        while url:
+            feed = await self.get_feed(url)
+
+            for elem in _filter_entries(feed, title=title):
+                yield AsyncSpreadsheet(self, elem)
+
+            url = pages.next_url(feed)
+
+    async def refresh(self):
+        """Downloads the spreadsheets feed used to open spreadsheets by
+        title or key again, as :meth:`gspread.Client.refresh` does.
+
+        """
+        self._spreadsheets = _SpreadsheetsCache(
+            await self.get_spreadsheets_feed(), _clock())
+        return self._spreadsheets
+
+    async def _find_entry(self, index, name):
+        cache = self._cached_spreadsheets()
+        elem = getattr(cache, index).get(name) if cache is not None else None
+
+        if elem is None:
+            elem = getattr(await self.refresh(), index).get(name)
+
+        return elem
+
+    async def get_spreadsheets_feed(self, visibility='private',
+                                    projection='full'):
+        url = construct_url('spreadsheets',
+                            visibility=visibility, projection=projection)
+
+        return await self.get_feed(url)
+
+    async def get_worksheets_feed(self, spreadsheet,
+                                  visibility='private', projection='full'):
+        url = construct_url('worksheets', spreadsheet,
+                            visibility=visibility, projection=projection)
+
+        return await self.get_feed(url)
+
+    async def get_cells_feed(self, worksheet, visibility='private',
+                             projection='full', params=None):
+        url = self._cells_feed_url(worksheet, visibility, projection, params)
+
+        return await self.get_feed(url)
+
+    async def iter_cells_feed(self, worksheet, visibility='private',
+                              projection='full', params=None):
+        """Streams the cells feed of `worksheet`, yielding its ``entry``
+        elements one at a time, as :meth:`gspread.Client.iter_cells_feed`
+        does.
+
+        """
+        url = self._cells_feed_url(worksheet, visibility, projection, params)
+
+        r = await self.session.get(url, stream=True)
+        async for elem in _aiter_feed_entries(r):
+            yield elem
+
+    async def iter_cells_feed_if_changed(self, worksheet, etag,
+                                         visibility='private',
+                                         projection='full', params=None):
+        """Streams the cells feed of `worksheet` unless it still matches
+        `etag`, as :meth:`gspread.Client.iter_cells_feed_if_changed` does.
+        The entries are yielded by an asynchronous iterator.
+
+        """
+        url = self._cells_feed_url(worksheet, visibility, projection, params)
+        headers = {'GData-Version': '3.0'}
+        if etag:
+            headers['If-None-Match'] = etag
+
+        r = await self.session.get(url, headers=headers, stream=True)
+        if r.status_code == 304:
+            r.close()
+            return etag, None
+
+        return r.headers.get('ETag'), _aiter_feed_entries(r)
+
+    async def get_feed(self, url):
+        r = await self.session.get(url)
+        return ElementTree.fromstring(r.content)
+
+    async def del_worksheet(self, worksheet):
+        url = construct_url(
+            'worksheet', worksheet, 'private', 'full', worksheet_version=worksheet.version)
+        await self.session.delete(url)
+
+    async def get_cells_cell_id_feed(self, worksheet, cell_id,
+                                     visibility='private', projection='full'):
+        url = construct_url('cells_cell_id', worksheet, cell_id=cell_id,
+                            visibility=visibility, projection=projection)
+
+        return await self.get_feed(url)
+
+    async def put_feed(self, url, data):
+        headers = {'Content-Type': 'application/atom+xml',
+                   'If-Match': '*'}
+        data = self._ensure_xml_header(data)
+
+        try:
+            r = await self.session.put(url, data, headers=headers)
+        except HTTPError as ex:
+            if getattr(ex, 'code', None) == 403:
+                raise UpdateCellError(ex.message)
+            else:
+                raise
+
+        return ElementTree.fromstring(r.content)
+
+    async def post_feed(self, url, data):
+        headers = {'Content-Type': 'application/atom+xml'}
+        data = self._ensure_xml_header(data)
+
+        try:
+            r = await self.session.post(url, data, headers=headers)
+        except HTTPError as ex:
+            raise RequestError(ex.message)
+
+        return ElementTree.fromstring(r.content)
+
+    async def post_cells(self, worksheet, data):
+        headers = {'Content-Type': 'application/atom+xml',
+                   'If-Match': '*'}
+        data = self._ensure_xml_header(data)
+        url = construct_url('cells_batch', worksheet)
+        # batch updates set absolute cell values, so repeating them is safe
+        r = await self.session.post(url, data, headers=headers,
+                                    idempotent=True)
+
+        return ElementTree.fromstring(r.content)
+
+    async def close(self):
+        """Closes the client's HTTP session."""
+        await self.session.close()
+
+
+class AsyncSpreadsheet(Spreadsheet):
+
+    """A spreadsheet opened by an :class:`AsyncClient`. Methods fetching
+    worksheets are coroutines.
+
+    """
+
+    async def _fetch_sheets(self):
+        feed = await self.client.get_worksheets_feed(self)
+        for elem in feed.findall(_ns('entry')):
+            self._sheet_list.append(AsyncWorksheet(self, elem))
+
+    async def add_worksheet(self, title, rows, cols):
+        """Adds a new worksheet to a spreadsheet, returning an
+        :class:`AsyncWorksheet`.
+
+        :param title: A title of a new worksheet.
+        :param rows: Number of rows.
+        :param cols: Number of columns.
+
+        """
+        feed = self._create_worksheet_feed(title, rows, cols)
+
+        url = construct_url('worksheets', self)
+        elem = await self.client.post_feed(url, ElementTree.tostring(feed))
+
+        worksheet = AsyncWorksheet(self, elem)
+        self._sheet_list.append(worksheet)
+
+        return worksheet
+
+    async def del_worksheet(self, worksheet):
+        """Deletes a worksheet from a spreadsheet.
+
+        :param worksheet: The worksheet to be deleted.
+
+        """
+        await self.client.del_worksheet(worksheet)
+        self._sheet_list.remove(worksheet)
+
+    async def worksheets(self):
+        """Returns a list of all :class:`worksheets <AsyncWorksheet>`
+        in a spreadsheet.
+
+        """
+        if not self._sheet_list:
+            await self._fetch_sheets()
+        return self._sheet_list[:]
+
+    async def worksheet(self, title):
+        """Returns a worksheet with specified `title`.
+
+        :param title: A title of a worksheet.
+
+        """
+        if not self._sheet_list:
+            await self._fetch_sheets()
+
+        try:
+            return finditem(lambda x: x.title == title, self._sheet_list)
+        except StopIteration:
+            raise WorksheetNotFound(title)
+
+    async def get_worksheet(self, index):
+        """Returns a worksheet with specified `index`, or `None` if the
+        worksheet is not found.
+
+        :param index: An index of a worksheet. Indexes start from zero.
+
+        """
+        if not self._sheet_list:
+            await self._fetch_sheets()
+        try:
+            return self._sheet_list[index]
+        except IndexError:
+            return None
+
+    async def map(self, func, workers=10):
+        """Awaits `func` with every worksheet of the spreadsheet, running
+        up to `workers` calls concurrently, and returns a dict of the
+        results keyed by worksheet title.
+
+        :param func: A coroutine function taking an :class:`AsyncWorksheet`.
+        :param workers: (optional) Maximum number of worksheets processed
+                        at the same time.
+
+        """
+        sheets = await self.worksheets()
+        semaphore = asyncio.Semaphore(workers)
+
+        async def call(sheet):
+            async with semaphore:
+                return await func(sheet)
+
+        results = await asyncio.gather(*[call(sheet) for sheet in sheets])
+
+        return dict((sheet.title, result)
+                    for sheet, result in zip(sheets, results))
+
+    async def get_all_values_all_sheets(self, workers=10):
+        """Returns the values of all worksheets in a dict keyed by
+        worksheet title. The worksheets are read concurrently.
+
+        :param workers: (optional) Maximum number of worksheets read
+                        at the same time.
+
+        """
+        return await self.map(lambda sheet: sheet.get_all_values(), workers)
+
+    def __iter__(self):
+        raise TypeError("use 'await spreadsheet.worksheets()' instead")
+
+
+class AsyncWorksheet(Worksheet):
+
+    """A worksheet of an :class:`AsyncSpreadsheet`. Methods sending
+    requests are coroutines, and the streamed reads :meth:`iter_values`
+    and :meth:`iter_rows` are asynchronous generators.
+
+    Cell values are read and written the same way as with
+    :class:`~gspread.Worksheet`, and :meth:`~gspread.Worksheet.enable_cache`
+    keeps a local copy of the cells as it does there.
+
+    """
+
+    async def _fetch_updated(self):
+        self_uri = self._get_link('self', self._element).get('href')
+        self._element = await self.client.get_feed(self_uri)
+        return self.updated
+
+    async def _cached_cells(self):
+        cache = self._cells_cache
+        updated = None
+
+        if not cache.etag:
+            # see Worksheet._cached_cells
+            updated = await self._fetch_updated()
+            if cache.cells is not None and updated == cache.updated:
+                return cache.cells
+
+        etag, entries = await self.client.iter_cells_feed_if_changed(
+            self, cache.etag)
+        if entries is not None:
+            cache.cells = [Cell(self, elem) async for elem in entries]
+            cache.etag = etag
+            cache.updated = updated
+
+        return cache.cells
+
+    async def _iter_cells(self, params=None):
+        if (self._cells_cache is not None and
+                set(params or ()).issubset(_BOUNDS_PARAMS)):
+            for cell in await self._cached_cells():
+                if not params or _in_bounds(cell, params):
+                    yield cell
+            return
+
+        async for elem in self.client.iter_cells_feed(self, params=params):
+            yield Cell(self, elem)
+
+    async def acell(self, label):
+        """Returns an instance of a :class:`~gspread.Cell`.
+
+        :param label: String with cell label in common format, e.g. 'B1'.
+
+        """
+        return await self.cell(*(self.get_int_addr(label)))
+
+    async def cell(self, row, col):
+        """Returns an instance of a :class:`~gspread.Cell` positioned in
+        `row` and `col` column.
+
+        """
+        feed = await self.client.get_cells_cell_id_feed(
+            self, self._cell_addr(row, col))
+        return Cell(self, feed)
+
+    async def cells(self, positions):
+        """Returns a list of :class:`~gspread.Cell` objects at the given
+        (row, col) positions, in the same order, reading all of them in a
+        single batch request.
+
+        """
+        addrs = [self._cell_addr(row, col) for row, col in positions]
+        if not addrs:
+            return []
+
+        feed = self._create_query_feed(addrs)
+        response = await self.client.post_cells(self,
+                                                ElementTree.tostring(feed))
+
+        return self._read_query_response(addrs, response)
+
+    async def acells(self, labels):
+        """Returns a list of :class:`~gspread.Cell` objects for the given
+        labels, e.g. ['A1', 'Z99'], in the same order.
+
+        """
+        return await self.cells([self.get_int_addr(label)
+                                 for label in labels])
+
+    async def range(self, alphanum):
+        """Returns a list of :class:`~gspread.Cell` objects from specified
+        range.
+
+        :param alphanum: A string with range value in common format,
+                         e.g. 'A1:A5'.
+
+        """
+        return [cell async for cell in self._iter_cells(
+            params={'range': alphanum, 'return-empty': 'true'})]
+
+    async def batch_get(self, ranges, workers=10):
+        """Returns a list of :class:`~gspread.Cell` objects for every range
+        in `ranges`, in the same order. The ranges are requested
+        concurrently.
+
+        :param ranges: A list of strings with range values in common
+                       format, e.g. ['A1:C10', 'F1:F200'].
+        :param workers: (optional) Maximum number of ranges requested at
+                        the same time.
+
+        """
+        semaphore = asyncio.Semaphore(workers)
+
+        async def get_range(alphanum):
+            async with semaphore:
+                return await self.range(alphanum)
+
+        return await asyncio.gather(*[get_range(alphanum)
+                                      for alphanum in ranges])
+
+    async def get_all_values(self, min_row=None, max_row=None,
+                             min_col=None, max_col=None):
+        """Returns a list of lists containing all cells' values as strings.
+
+        The optional bounds are the same as for
+        :meth:`gspread.Worksheet.get_all_values`.
+
+        """
+        return _pad_rows([row async for row in self.iter_values(
+            min_row, max_row, min_col, max_col)])
+
+    async def iter_values(self, min_row=None, max_row=None,
+                          min_col=None, max_col=None):
+        """Yields the worksheet's values row by row as lists of strings,
+        as :meth:`gspread.Worksheet.iter_values` does.
+
+        >>> async for row in wks.iter_values():
+        ...     print(row)
+
+        """
+        params = _bounds(min_row, max_row, min_col, max_col)
+
+        async for row in _aiter_rows(self._iter_cells(params=params),
+                                     min_row or 1, min_col or 1):
+            yield row
+
+    async def _read_window(self, min_row, max_row):
+        cells = self._iter_cells(params=_bounds(min_row, max_row))
+        return [row async for row in _aiter_rows(cells, min_row)]
+
+    async def _row_windows(self, first_row, batch_rows, read_ahead):
+        """Reads the worksheet `batch_rows` rows at a time, starting at
+        `first_row`, and yields the rows of values of each window. Up to
+        `read_ahead` following windows are requested while the current one
+        is processed.
+
+        """
+        starts = iter(range(first_row, self.row_count + 1, batch_rows))
+        pending = deque()
+
+        def schedule():
+            for min_row in starts:
+                max_row = min(min_row + batch_rows - 1, self.row_count)
+                task = asyncio.ensure_future(
+                    self._read_window(min_row, max_row))
+                pending.append((min_row, max_row, task))
+                return
+
+        for i in range(read_ahead + 1):
+            schedule()
+
+        empty = 0
+        try:
+            while pending:
+                min_row, max_row, task = pending.popleft()
+                rows = await task
+                schedule()
+
+                # trailing empty rows are never yielded
+                if rows:
+                    yield [[] for i in range(empty)] + rows
+                    empty = 0
+
+                empty += max_row - min_row + 1 - len(rows)
+        finally:
+            for min_row, max_row, task in pending:
+                task.cancel()
+
+    async def iter_rows(self, batch_rows=1000, records=False, head=1,
+                        empty2zero=False, read_ahead=0):
+        """Yields the worksheet's rows, reading `batch_rows` rows at a
+        time, as :meth:`gspread.Worksheet.iter_rows` does.
+
+        :param read_ahead: (optional) Number of windows requested
+                           concurrently while the caller processes the
+                           current one.
+
+        >>> async for record in wks.iter_rows(records=True, read_ahead=2):
+        ...     process(record)
+
+        """
+        keys = None
+
+        async for rows in self._row_windows(head if records else 1,
+                                            batch_rows, read_ahead):
+            keys, rows = self._shape_window(rows, keys, records, empty2zero)
+            for row in rows:
+                yield row
+
+    async def get_all_records(self, empty2zero=False, head=1, schema=None,
+                              use_numeric_value=False):
+        """Returns a list of dictionaries keyed by the `head` row, as
+        :meth:`gspread.Worksheet.get_all_records` does.
+
+        :param empty2zero: determines whether empty cells are converted to zeros.
+        :param head: determines wich row to use as keys, starting from 1
+            following the numeration of the spreadsheet.
+        :param schema: (optional) 'infer' or a dict of conversion functions
+            by key, as for :meth:`gspread.Worksheet.get_all_records`.
+        :param use_numeric_value: (optional) If True, numbers are taken from
+            the numeric values the server sends for numeric cells.
+
+        """
+        if use_numeric_value:
+            rows = _aiter_rows(self._iter_cells(),
+                               value=_record_value(head, schema))
+            data = _pad_rows([row async for row in rows])
+        else:
+            data = await self.get_all_values()
+
+        return _records(data, empty2zero, head, schema)
+
+    async def _fetch_columns(self, head=0):
+        cells = self._iter_cells(params=_bounds(min_row=head or None))
+        return _collect_columns([cell async for cell in cells], head)
+
+    async def get_all_values_array(self, use_numpy=False):
+        """Returns all cells' values column by column, as
+        :meth:`gspread.Worksheet.get_all_values_array` does.
+
+        """
+        return self._values_array(await self._fetch_columns(), use_numpy)
+
+    async def get_all_records_array(self, empty2zero=False, head=1,
+                                    use_numpy=False):
+        """Returns all records column by column, as
+        :meth:`gspread.Worksheet.get_all_records_array` does.
+
+        """
+        return self._records_array(await self._fetch_columns(head),
+                                   empty2zero, use_numpy)
+
+    async def row_values(self, row):
+        """Returns a list of all values in a `row`."""
+        if self._cells_cache is not None:
+            values = [''] * self.col_count
+            for cell in await self._cached_cells():
+                if cell.row == row and cell.col <= len(values):
+                    values[cell.col - 1] = cell.value
+            return values
+
+        start_cell = self.get_addr_int(row, 1)
+        end_cell = self.get_addr_int(row, self.col_count)
+
+        row_cells = await self.range('%s:%s' % (start_cell, end_cell))
+        return [cell.value for cell in row_cells]
+
+    async def col_values(self, col):
+        """Returns a list of all values in column `col`."""
+        if self._cells_cache is not None:
+            values = [''] * self.row_count
+            for cell in await self._cached_cells():
+                if cell.col == col and cell.row <= len(values):
+                    values[cell.row - 1] = cell.value
+            return values
+
+        start_cell = self.get_addr_int(1, col)
+        end_cell = self.get_addr_int(self.row_count, col)
+
+        row_cells = await self.range('%s:%s' % (start_cell, end_cell))
+        return [cell.value for cell in row_cells]
+
+    async def update_acell(self, label, val):
+        """Sets the new value to a cell.
+
+        :param label: String with cell label in common format, e.g. 'B1'.
+        :param val: New value.
+
+        """
+        return await self.update_cell(*(self.get_int_addr(label)), val=val)
+
+    async def update_cell(self, row, col, val):
+        """Sets the new value to a cell.
+
+        :param row: Row number.
+        :param col: Column number.
+        :param val: New value.
+
+        """
+        self._invalidate_cache()
+
+        feed = await self.client.get_cells_cell_id_feed(
+            self, self._cell_addr(row, col))
+        cell_elem = feed.find(_ns1('cell'))
+        cell_elem.set('inputValue', str(val))
+        uri = self._get_link('edit', feed).get('href')
+
+        await self.client.put_feed(uri, ElementTree.tostring(feed))
+
+    async def _post_batches(self, cell_list, batch_size, workers):
+        semaphore = asyncio.Semaphore(workers)
+
+        async def post_batch(batch):
+            feed = self._create_update_feed(batch)
+            async with semaphore:
+                response = await self.client.post_cells(
+                    self, ElementTree.tostring(feed))
+            return response.findall(_ns('entry'))
+
+        responses = await asyncio.gather(
+            *[post_batch(batch)
+              for batch in self._batches(cell_list, batch_size)])
+
+        return [entry for entries in responses for entry in entries]
+
+    async def update_cells(self, cell_list, batch_size=None, workers=1,
+                           retries=0, changed_only=True):
+        """Updates cells in batch, returning an
+        :class:`~gspread.UpdateResult`.
+
+        :param cell_list: List of a :class:`~gspread.Cell` objects to update.
+        :param batch_size: (optional) Maximum number of cells sent in one
+                           request. By default all cells are sent at once.
+        :param workers: (optional) Number of batches sent concurrently.
+        :param retries: (optional) Number of times the cells the server
+                        failed to update are sent again.
+        :param changed_only: (optional) If True, cells whose value wasn't
+                             modified are skipped.
+
+        """
+        self._invalidate_cache()
+
+        result = UpdateResult()
+        pending = self._modified_cells(result, cell_list, changed_only)
+
+        for attempt in range(retries + 1):
+            if not pending:
+                break
+
+            entries = await self._post_batches(pending, batch_size, workers)
+            pending = self._read_batch_response(result, pending, entries)
+
+        return result
+
+    async def resize(self, rows=None, cols=None):
+        """Resizes the worksheet.
+
+        :param rows: New rows number.
+        :param cols: New columns number.
+        """
+        if rows is None and cols is None:
+            raise TypeError("Either 'rows' or 'cols' should be specified.")
+
+        self._invalidate_cache()
+
+        self_uri = self._get_link('self', self._element).get('href')
+        feed = await self.client.get_feed(self_uri)
+        uri = self._get_link('edit', feed).get('href')
+        self._set_size(feed, rows, cols)
+
+        self._element = await self.client.put_feed(
+            uri, ElementTree.tostring(feed))
+
+    async def add_rows(self, rows):
+        """Adds rows to worksheet.
+
+        :param rows: Rows number to add.
+        """
+        await self.resize(rows=self.row_count + rows)
+
+    async def add_cols(self, cols):
+        """Adds colums to worksheet.
+
+        :param cols: Columns number to add.
+        """
+        await self.resize(cols=self.col_count + cols)
+
+    async def append_row(self, values):
+        """Adds a row to the worksheet and populates it with values.
+
+        :param values: List of values for the new row.
+        """
+        return await self.append_rows([values])
+
+    async def append_rows(self, rows):
+        """Adds rows to the worksheet and populates them with values, as
+        :meth:`gspread.Worksheet.append_rows` does.
+
+        :param rows: List of lists of values for the new rows.
+        """
+        if not rows:
+            return
+
+        first_row = self.row_count + 1
+        data_width = max(len(values) for values in rows)
+        await self.resize(
+            rows=self.row_count + len(rows),
+            cols=data_width if self.col_count < data_width else None)
+
+        if not data_width:
+            return
+
+        top_left = self.get_addr_int(first_row, 1)
+        bottom_right = self.get_addr_int(first_row + len(rows) - 1,
+                                         data_width)
+        cells = await self.range('%s:%s' % (top_left, bottom_right))
+
+        return await self.update_cells(
+            self._fill_cells(cells, rows, first_row))
+
+    async def insert_row(self, values, index=1):
+        """Adds a row to the worksheet at the specified index and populates
+        it with values.
+
+        :param values: List of values for the new row.
+        """
+        return await self.insert_rows([values], index)
+
+    async def insert_rows(self, rows, index=1, batch_size=1000):
+        """Inserts rows at the specified index and populates them with
+        values, moving the rows below down, as
+        :meth:`gspread.Worksheet.insert_rows` does.
+
+        :param rows: List of lists of values for the new rows.
+        :param index: (optional) Row number of the first new row.
+        :param batch_size: (optional) Maximum number of cells sent in one
+                           request.
+        """
+        if not rows:
+            return
+
+        if index == self.row_count + 1:
+            return await self.append_rows(rows)
+        elif index > self.row_count + 1:
+            raise IndexError('Row index out of range')
+
+        data_width = max(len(values) for values in rows)
+        await self.resize(
+            rows=self.row_count + len(rows),
+            cols=data_width if self.col_count < data_width else None)
+
+        top_left = self.get_addr_int(index, 1)
+        bottom_right = self.get_addr_int(self.row_count, self.col_count)
+        cells = await self.range('%s:%s' % (top_left, bottom_right))
+
+        return await self.update_cells(self._shift_cells(cells, rows, index),
+                                       batch_size=batch_size)
+
+    async def find(self, query, in_row=None, in_column=None):
+        """Finds first cell matching query.
+
+        :param query: A text string or compiled regular expression.
+        :param in_row: (optional) Row number to search in.
+        :param in_column: (optional) Column number to search in.
+        """
+        match = _matcher(query)
+        cells = self._iter_cells(
+            params=_bounds(in_row, in_row, in_column, in_column))
+
+        try:
+            async for cell in cells:
+                if match(cell):
+                    return self._own(cell)
+        finally:
+            # releases the streamed feed when a match is found early
+            await cells.aclose()
+
+        raise CellNotFound(query)
+
+    async def findall(self, query, in_row=None, in_column=None):
+        """Finds all cells matching query.
+
+        :param query: A text string or compiled regular expression.
+        :param in_row: (optional) Row number to search in.
+        :param in_column: (optional) Column number to search in.
+        """
+        match = _matcher(query)
+        cells = self._iter_cells(
+            params=_bounds(in_row, in_row, in_column, in_column))
+
+        return [self._own(cell) async for cell in cells if match(cell)]
+
+    async def build_index(self, columns=None):
+        """Reads the worksheet's cells once and returns an
+        :class:`AsyncCellIndex` for repeated lookups by value.
+
+        :param columns: (optional) List of column numbers to index. All
+                        columns are indexed by default.
+
+        """
+        index = AsyncCellIndex(self, columns)
+        await index.refresh()
+        return index
+
+    async def export(self, format='csv'):
+        """Export the worksheet in specified format.
+
+        :param format: A format of the output.
+        """
+        r = await self.client.session.get(self._export_url(format))
+        return r.content
+
+
+class AsyncCellIndex(CellIndex):
+
+    """A :class:`~gspread.CellIndex` of an :class:`AsyncWorksheet`. Only
+    :meth:`refresh` sends requests, so it's the only coroutine. Use
+    :meth:`AsyncWorksheet.build_index` to create an index.
+
+    """
+
+    def __init__(self, worksheet, columns=None):
+        self.worksheet = worksheet
+        self.columns = frozenset(columns) if columns else None
+        self._load(())
+
+    async def refresh(self):
+        """Reads the worksheet's cells again and rebuilds the index."""
+        cells = self.worksheet._iter_cells(params=self._params())
+        self._load([cell async for cell in cells])
+
+
+def authorize(credentials):
+    """Login to Google API using OAuth2 credentials.
+
+    This is a shortcut function which instantiates :class:`AsyncClient`
+    and performs login right away.
+
+    :returns: :class:`AsyncClient` instance.
+
+    """
+    client = AsyncClient(auth=credentials)
+    client.login()
+    return client
@@ -16,7 +16,7 @@ from xml.etree import ElementTree
 from . import __version__
 from . import urlencode
 from .ns import _ns
-from .httpsession import HTTPSession, HTTPError
+from .httpsession import HTTPSession, HTTPError, _clock
 from .models import Spreadsheet
 from .urls import construct_url
 from .utils import finditem
@@ -32,6 +32,96 @@ _url_key_re_v1 = re.compile(r'key=([^&#]+)')
 _url_key_re_v2 = re.compile(r'spreadsheets/d/([^&#]+)/edit')
 
 
+def _url_key(url):
+    """Extracts a spreadsheet key from its URL.
+
+    :raises gspread.NoValidUrlKeyFound: if `url` contains no key.
+
+    """
+    for url_key_re in (_url_key_re_v1, _url_key_re_v2):
+        m = url_key_re.search(url)
+        if m:
+            return m.group(1)
+
+    raise NoValidUrlKeyFound
+
+
+def _entry_key(elem):
+    """Returns the key of a spreadsheets feed entry, or None."""
+    alter_link = finditem(lambda x: x.get('rel') == 'alternate',
+                          elem.findall(_ns('link')))
+    try:
+        return _url_key(alter_link.get('href'))
+    except NoValidUrlKeyFound:
+        return None
+
+
+def _filter_entries(feed, title=None, key=None):
+    """Yields the entries of a spreadsheets feed with `title` and `key`."""
+    for elem in feed.findall(_ns('entry')):
+        if title is not None and elem.find(_ns('title')).text.strip() != title:
+            continue
+        if key is not None and _entry_key(elem) != key:
+            continue
+        yield elem
+
+
+class _SpreadsheetsPages(object):
+
+    """Tracks the URLs of the pages of the spreadsheets feed read by
+    :meth:`Client.iter_spreadsheets`.
+
+    """
+
+    def __init__(self, title, page_size):
+        self.page_size = page_size
+        self.params = {'max-results': page_size}
+        if title is not None:
+            self.params['title'] = title
+            self.params['title-exact'] = 'true'
+
+        self.feed_url = construct_url('spreadsheets')
+        self.start_index = 1
+
+    def first_url(self):
+        return '%s?%s' % (self.feed_url, urlencode(self.params))
+
+    def next_url(self, feed):
+        """Returns the URL of the page following `feed`, or None."""
+        entries = len(feed.findall(_ns('entry')))
+        self.start_index += entries
+
+        next_link = [link for link in feed.findall(_ns('link'))
+                     if link.get('rel') == 'next']
+        if next_link:
+            return next_link[0].get('href')
+
+        if entries == self.page_size:
+            # no next link, so ask for the following page explicitly
+            self.params['start-index'] = self.start_index
+            return '%s?%s' % (self.feed_url, urlencode(self.params))
+
+        return None
+
+
+class _SpreadsheetsCache(object):
+
+    """The entries of a spreadsheets feed indexed by key and title."""
+
+    def __init__(self, feed, fetched):
+        self.feed = feed
+        self.fetched = fetched
+        self.by_key = {}
+        self.by_title = {}
+
+        for elem in feed.findall(_ns('entry')):
+            key = _entry_key(elem)
+            if key is not None:
+                self.by_key.setdefault(key, elem)
+            self.by_title.setdefault(elem.find(_ns('title')).text.strip(),
+                                     elem)
+
+
 class Client(object):
 
     """An instance of this class communicates with Google Data API.
@@ -41,6 +131,12 @@ class Client(object):
                  oauth2client library. https://github.com/google/oauth2client
     :param http_session: (optional) A session object capable of making HTTP requests while persisting headers.
                                     Defaults to :class:`~gspread.httpsession.HTTPSession`.
+    :param retry_policy: (optional) A :class:`~gspread.httpsession.RetryPolicy` applied to all requests
+                                    made through the session.
+    :param rate_limiter: (optional) A :class:`~gspread.httpsession.RateLimiter` consulted before all
+                                    requests made through the session. It may be shared between clients.
+    :param metadata_ttl: (optional) Number of seconds the spreadsheets feed is kept for opening
+                                    spreadsheets by title or key. 0 disables caching.
 
     >>> c = gspread.Client(auth=('user@example.com', 'qwertypassword'))
 
@@ -50,9 +146,16 @@ class Client(object):
 
 
     """
-    def __init__(self, auth, http_session=None):
+    def __init__(self, auth, http_session=None, retry_policy=None,
+                 rate_limiter=None, metadata_ttl=60):
         self.auth = auth
+        self.metadata_ttl = metadata_ttl
+        self._spreadsheets = None
         self.session = http_session or HTTPSession()
+        if retry_policy is not None:
+            self.session.retry_policy = retry_policy
+        if rate_limiter is not None:
+            self.session.rate_limiter = rate_limiter
 
     def _get_auth_token(self, content):
         for line in content.splitlines():
@@ -142,15 +245,12 @@ class Client(object):
         >>> c.open('My fancy spreadsheet')
 
         """
-        feed = self.get_spreadsheets_feed()
-
-        for elem in feed.findall(_ns('entry')):
-            elem_title = elem.find(_ns('title')).text
-            if elem_title.strip() == title:
-                return Spreadsheet(self, elem)
-        else:
+        elem = self._find_entry('by_title', title)
+        if elem is None:
             raise SpreadsheetNotFound
 
+        return Spreadsheet(self, elem)
+
     def open_by_key(self, key):
         """Opens a spreadsheet specified by `key`, returning a :class:`~gspread.Spreadsheet` instance.
 
@@ -164,20 +264,22 @@ class Client(object):
         >>> c.open_by_key('0BmgG6nO_6dprdS1MN3d3MkdPa142WFRrdnRRUWl1UFE')
 
         """
-        feed = self.get_spreadsheets_feed()
-        for elem in feed.findall(_ns('entry')):
-            alter_link = finditem(lambda x: x.get('rel') == 'alternate',
-                                  elem.findall(_ns('link')))
-            m = _url_key_re_v1.search(alter_link.get('href'))
-            if m and m.group(1) == key:
-                return Spreadsheet(self, elem)
+        cache = self._cached_spreadsheets()
+        elem = cache.by_key.get(key) if cache is not None else None
 
-            m = _url_key_re_v2.search(alter_link.get('href'))
-            if m and m.group(1) == key:
-                return Spreadsheet(self, elem)
+        if elem is None:
+            try:
+                elem = self.get_feed(construct_url('spreadsheet',
+                                                   spreadsheet_id=key))
+            except HTTPError:
+                elem = self._find_entry('by_key', key)
+                if elem is None:
+                    raise SpreadsheetNotFound
+            else:
+                if cache is not None:
+                    cache.by_key[key] = elem
 
-        else:
-            raise SpreadsheetNotFound
+        return Spreadsheet(self, elem)
 
     def open_by_url(self, url):
         """Opens a spreadsheet specified by `url`,
@@ -193,17 +295,7 @@ class Client(object):
         >>> c.open_by_url('https://docs.google.com/spreadsheet/ccc?key=0Bm...FE&hl')
 
         """
-        m1 = _url_key_re_v1.search(url)
-        if m1:
-            return self.open_by_key(m1.group(1))
-
-        else:
-            m2 = _url_key_re_v2.search(url)
-            if m2:
-                return self.open_by_key(m2.group(1))
-
-            else:
-                raise NoValidUrlKeyFound
+        return self.open_by_key(_url_key(url))
 
     def openall(self, title=None):
         """Opens all available spreadsheets,
@@ -213,16 +305,72 @@ class Client(object):
                       spreadsheets by title.
 
         """
-        feed = self.get_spreadsheets_feed()
-        result = []
-        for elem in feed.findall(_ns('entry')):
-            if title is not None:
-                elem_title = elem.find(_ns('title')).text
-                if elem_title.strip() != title:
-                    continue
-            result.append(Spreadsheet(self, elem))
+        cache = self._cached_spreadsheets() or self.refresh()
 
-        return result
+        return [Spreadsheet(self, elem)
+                for elem in _filter_entries(cache.feed, title=title)]
+
+    def iter_spreadsheets(self, title=None, page_size=100):
+        """Yields :class:`~gspread.Spreadsheet` instances for all available
+        spreadsheets, fetching the spreadsheets feed a page at a time.
+
+        Only one page of the feed is held in memory, and the first
+        spreadsheets are yielded before the following pages are requested.
+
+        :param title: (optional) If specified only spreadsheets with this
+                      exact title are yielded.
+        :param page_size: (optional) Number of spreadsheets requested at
+                          once.
+
+        >>> for sh in c.iter_spreadsheets(page_size=50):
+        ...     print(sh.title)
+
+        """
+        pages = _SpreadsheetsPages(title, page_size)
+        url = pages.first_url()
+
+        while url:
+            feed = self.get_feed(url)
+
+            for elem in _filter_entries(feed, title=title):
+                yield Spreadsheet(self, elem)
+
+            url = pages.next_url(feed)
+
+    def refresh(self):
+        """Downloads the spreadsheets feed used to open spreadsheets by
+        title or key again, e.g. after spreadsheets were created or renamed
+        elsewhere.
+
+        Spreadsheets that aren't found are looked up again in a fresh feed
+        anyway, so refreshing is only needed to see renames before the
+        cache expires.
+
+        """
+        self._spreadsheets = _SpreadsheetsCache(self.get_spreadsheets_feed(),
+                                                _clock())
+        return self._spreadsheets
+
+    def _cached_spreadsheets(self):
+        """Returns the cached spreadsheets feed, or None if it has expired."""
+        cache = self._spreadsheets
+        if (cache is not None and self.metadata_ttl and
+                _clock() - cache.fetched < self.metadata_ttl):
+            return cache
+        return None
+
+    def _find_entry(self, index, name):
+        """Looks up a spreadsheets feed entry by key or title, downloading
+        the feed again if `name` isn't in the cached one.
+
+        """
+        cache = self._cached_spreadsheets()
+        elem = getattr(cache, index).get(name) if cache is not None else None
+
+        if elem is None:
+            elem = getattr(self.refresh(), index).get(name)
+
+        return elem
 
     def get_spreadsheets_feed(self, visibility='private', projection='full'):
         url = construct_url('spreadsheets',
@@ -239,9 +387,7 @@ class Client(object):
         r = self.session.get(url)
         return ElementTree.fromstring(r.content)
 
-    def get_cells_feed(self, worksheet,
-                       visibility='private', projection='full', params=None):
-
+    def _cells_feed_url(self, worksheet, visibility, projection, params):
         url = construct_url('cells', worksheet,
                             visibility=visibility, projection=projection)
 
@@ -249,9 +395,60 @@ class Client(object):
             params = urlencode(params)
             url = '%s?%s' % (url, params)
 
+        return url
+
+    def get_cells_feed(self, worksheet,
+                       visibility='private', projection='full', params=None):
+
+        url = self._cells_feed_url(worksheet, visibility, projection, params)
+
         r = self.session.get(url)
         return ElementTree.fromstring(r.content)
 
+    def iter_cells_feed(self, worksheet,
+                        visibility='private', projection='full', params=None):
+        """Streams the cells feed of `worksheet`, yielding its ``entry``
+        elements one at a time.
+
+        The response body is read and parsed incrementally and every entry
+        is cleared once the consumer asks for the next one, so only a single
+        entry is kept in memory at any time.
+
+        :param params: (optional) A dict of query parameters, the same as
+                       for :meth:`get_cells_feed`.
+
+        """
+        url = self._cells_feed_url(worksheet, visibility, projection, params)
+
+        r = self.session.get(url, stream=True)
+        return _iter_feed_entries(r)
+
+    def iter_cells_feed_if_changed(self, worksheet, etag,
+                                   visibility='private', projection='full',
+                                   params=None):
+        """Streams the cells feed of `worksheet` unless it still matches
+        `etag`.
+
+        Returns a tuple of the feed's current ETag, None if the server
+        didn't send one, and an iterator over the feed entries as returned
+        by :meth:`iter_cells_feed`. The iterator is None if the feed hasn't
+        changed.
+
+        :param etag: The ETag of a previous response or None.
+
+        """
+        url = self._cells_feed_url(worksheet, visibility, projection, params)
+        headers = {'GData-Version': '3.0'}
+        if etag:
+            headers['If-None-Match'] = etag
+
+        r = self.session.get(url, headers=headers, stream=True)
+        if r.status_code == 304:
+            r.close()
+            return etag, None
+
+        return r.headers.get('ETag'), _iter_feed_entries(r)
+
     def get_feed(self, url):
         r = self.session.get(url)
         return ElementTree.fromstring(r.content)
@@ -300,11 +497,33 @@ class Client(object):
                    'If-Match': '*'}
         data = self._ensure_xml_header(data)
         url = construct_url('cells_batch', worksheet)
-        r = self.session.post(url, data, headers=headers)
+        # batch updates set absolute cell values, so repeating them is safe
+        r = self.session.post(url, data, headers=headers, idempotent=True)
 
         return ElementTree.fromstring(r.content)
 
 
+def _iter_feed_entries(response):
+    """Incrementally parses a streamed feed response, yielding its entries.
+
+    Every entry is dropped from the tree as soon as the generator resumes.
+    """
+    entry_tag = _ns('entry')
+    response.raw.decode_content = True
+
+    try:
+        root = None
+        for event, elem in ElementTree.iterparse(response.raw,
+                                                 events=('start', 'end')):
+            if root is None:
+                root = elem
+            elif event == 'end' and elem.tag == entry_tag:
+                yield elem
+                root.clear()
+    finally:
+        response.close()
+
+
 def login(email, password):
     """Login to Google API using `email` and `password`.
 
@@ -8,7 +8,14 @@ This module contains a class for working with http sessions.
 
 """
 
+import random
+import threading
+import time
+from email.utils import parsedate_tz, mktime_tz
+
 import requests
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectTimeout, RequestException
 try:
     import httplib as client
     from urlparse import urlparse
@@ -27,50 +34,294 @@ except NameError:
 from .exceptions import HTTPError
 
 
+_clock = getattr(time, 'monotonic', time.time)
+
+
+def _retry_after(response):
+    """Returns the delay in seconds requested by a response's Retry-After
+    header, or None.
+
+    """
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        date = parsedate_tz(value)
+        if date is None:
+            return None
+        return max(0.0, mktime_tz(date) - time.time())
+
+
+def _prepare_request(session_headers, data, headers):
+    """Encodes request `data` and merges `headers` into a copy of
+    `session_headers`. Headers set to None are removed.
+
+    """
+    headers = dict(headers or {})
+
+    if data and isinstance(data, bytes):
+        data = data.decode()
+
+    if data and not isinstance(data, basestring):
+        data = urlencode(data)
+
+    if data is not None:
+        data = data.encode('utf8')
+
+    # If we have data and Content-Type is not set, set it...
+    if data and not headers.get('Content-Type', None):
+        headers['Content-Type'] = 'application/x-www-form-urlencoded'
+
+    request_headers = session_headers.copy()
+
+    if headers:
+        for k, v in headers.items():
+            if v is None:
+                del request_headers[k]
+            else:
+                request_headers[k] = v
+
+    return data, request_headers
+
+
+class RetryPolicy(object):
+
+    """Describes how :class:`HTTPSession` retries failed requests.
+
+       Attempt `n` is followed by a delay of ``backoff_factor * 2 ** (n - 1)``
+       seconds, at most `max_backoff`. A longer delay requested by the
+       response's Retry-After header is honoured.
+
+       Requests with idempotent methods are retried on any of the
+       `status_codes` and on connection errors and timeouts. Other requests
+       are retried only when the server can't have processed them: on 429
+       responses and on connect timeouts.
+
+       :param max_attempts: (optional) Maximum number of attempts, including
+                            the first one.
+       :param backoff_factor: (optional) Delay after the first attempt, in
+                              seconds.
+       :param max_backoff: (optional) Maximum delay between two attempts, in
+                           seconds.
+       :param jitter: (optional) If True, each delay is picked at random
+                      between zero and the computed delay, so that clients
+                      failing at the same time don't retry in lockstep.
+       :param status_codes: (optional) Response status codes to retry.
+       :param idempotent_methods: (optional) HTTP methods that are safe to
+                                  repeat.
+    """
+
+    def __init__(self, max_attempts=5, backoff_factor=0.5, max_backoff=64,
+                 jitter=True, status_codes=(429, 500, 502, 503, 504),
+                 idempotent_methods=('GET', 'HEAD', 'PUT', 'DELETE')):
+        self.max_attempts = max_attempts
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.status_codes = frozenset(status_codes)
+        self.idempotent_methods = frozenset(m.upper()
+                                            for m in idempotent_methods)
+
+    def is_idempotent(self, method):
+        return method.upper() in self.idempotent_methods
+
+    def should_retry(self, attempt, idempotent, status_code=None,
+                     error=None):
+        """Tells whether a request should be sent again after `attempt`
+        failed with either a `status_code` or a connection `error`.
+
+        """
+        if attempt >= self.max_attempts:
+            return False
+
+        if error is not None:
+            return idempotent or isinstance(error, ConnectTimeout)
+
+        if status_code not in self.status_codes:
+            return False
+
+        return idempotent or status_code == 429
+
+    def backoff(self, attempt, response=None):
+        """Returns the number of seconds to wait after `attempt`."""
+        delay = min(self.max_backoff,
+                    self.backoff_factor * 2 ** (attempt - 1))
+        if self.jitter:
+            delay = random.uniform(0, delay)
+
+        if response is not None:
+            retry_after = _retry_after(response)
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+
+        return delay
+
+
+class _TokenBucket(object):
+
+    def __init__(self, rate, capacity, now):
+        self.rate = float(rate)
+        self.capacity = capacity
+        self.tokens = capacity
+        self.stamp = now
+
+    def take(self, now):
+        """Takes a token and returns the number of seconds until it is
+        actually available. The balance may go negative, which reserves
+        tokens for waiting requests in the order they arrived.
+
+        """
+        self.tokens = min(self.capacity,
+                          self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+        self.tokens -= 1
+        return max(0.0, -self.tokens / self.rate)
+
+
+class RateLimiter(object):
+
+    """Limits the rate of requests with token buckets.
+
+       :class:`HTTPSession` asks the limiter before sending each request
+       and waits as long as needed to stay within the budgets. A limiter is
+       thread-safe, so a single instance can be shared by all sessions and
+       clients in a process that use the same quota.
+
+       :param per_second: (optional) Maximum number of requests per second.
+       :param per_100_seconds: (optional) Maximum number of requests per
+                               100 seconds.
+
+       >>> limiter = RateLimiter(per_second=10, per_100_seconds=500)
+       >>> c1 = gspread.Client(auth=credentials, rate_limiter=limiter)
+       >>> c2 = gspread.Client(auth=credentials, rate_limiter=limiter)
+    """
+
+    def __init__(self, per_second=None, per_100_seconds=None):
+        now = _clock()
+        self._buckets = []
+        if per_second:
+            self._buckets.append(_TokenBucket(per_second, per_second, now))
+        if per_100_seconds:
+            self._buckets.append(_TokenBucket(per_100_seconds / 100.0,
+                                              per_100_seconds, now))
+        self._lock = threading.Lock()
+
+        #: Number of requests let through.
+        self.requests = 0
+        #: Total number of seconds requests waited.
+        self.wait_time = 0.0
+
+    def reserve(self):
+        """Reserves a request without blocking and returns the number of
+        seconds to wait before sending it, e.g. with ``asyncio.sleep``.
+
+        """
+        with self._lock:
+            now = _clock()
+            delay = max([bucket.take(now) for bucket in self._buckets] +
+                        [0.0])
+            self.requests += 1
+            self.wait_time += delay
+
+        return delay
+
+    def acquire(self):
+        """Blocks until a request may be sent and returns the number of
+        seconds it waited.
+
+        """
+        delay = self.reserve()
+        if delay:
+            time.sleep(delay)
+
+        return delay
+
+
 class HTTPSession(object):
 
     """Handles HTTP activity while keeping headers persisting across requests.
 
        :param headers: A dict with initial headers.
+       :param pool_connections: (optional) Number of hosts to keep
+                                connection pools for.
+       :param pool_maxsize: (optional) Maximum number of connections kept
+                            open to a host. Set it to at least the number of
+                            threads sharing the session.
+       :param connect_timeout: (optional) Seconds to wait for a connection
+                               to be established. Waits forever by default.
+       :param read_timeout: (optional) Seconds to wait for the server to
+                            send data. Waits forever by default.
+       :param keep_alive: (optional) If False, connections are closed after
+                          every request instead of being reused.
+       :param retry_policy: (optional) A :class:`RetryPolicy` applied to
+                            every request. Requests aren't retried by
+                            default.
+       :param rate_limiter: (optional) A :class:`RateLimiter` consulted
+                            before every request, retries included.
     """
 
-    def __init__(self, headers=None):
+    def __init__(self, headers=None, pool_connections=10, pool_maxsize=10,
+                 connect_timeout=None, read_timeout=None, keep_alive=True,
+                 retry_policy=None, rate_limiter=None):
         self.headers = headers or {}
+        self.retry_policy = retry_policy
+        self.rate_limiter = rate_limiter
         self.requests_session = requests.Session()
 
-    def request(self, method, url, data=None, headers=None):
-        if data and isinstance(data, bytes):
-            data = data.decode()
+        adapter = HTTPAdapter(pool_connections=pool_connections,
+                              pool_maxsize=pool_maxsize)
+        self.requests_session.mount('https://', adapter)
+        self.requests_session.mount('http://', adapter)
 
-        if data and not isinstance(data, basestring):
-            data = urlencode(data)
+        self.timeout = (connect_timeout, read_timeout)
 
-        if data is not None:
-            data = data.encode('utf8')
+        if not keep_alive:
+            self.headers['Connection'] = 'close'
 
-        # If we have data and Content-Type is not set, set it...
-        if data and not headers.get('Content-Type', None):
-            headers['Content-Type'] = 'application/x-www-form-urlencoded'
-
-        request_headers = self.headers.copy()
-
-        if headers:
-            for k, v in headers.items():
-                if v is None:
-                    del request_headers[k]
-                else:
-                    request_headers[k] = v
+    def request(self, method, url, data=None, headers=None, stream=False,
+                idempotent=None):
+        data, request_headers = _prepare_request(self.headers, data, headers)
 
         try:
             func = getattr(self.requests_session, method.lower())
         except AttributeError:
             raise Exception("HTTP method '{}' is not supported".format(method))
-        response = func(url, data=data, headers=request_headers)
 
-        if response.status_code > 399:
-            raise HTTPError(response.status_code, "{}: {}".format(
-                response.status_code, response.content))
-        return response
+        retry = self.retry_policy
+        if retry is not None and idempotent is None:
+            idempotent = retry.is_idempotent(method)
+
+        attempt = 0
+        while True:
+            attempt += 1
+
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+
+            try:
+                response = func(url, data=data, headers=request_headers,
+                                stream=stream, timeout=self.timeout)
+            except RequestException as ex:
+                if retry is None or not retry.should_retry(
+                        attempt, idempotent, error=ex):
+                    raise
+                time.sleep(retry.backoff(attempt))
+                continue
+
+            if response.status_code > 399:
+                if retry is not None and retry.should_retry(
+                        attempt, idempotent, response.status_code):
+                    response.close()
+                    time.sleep(retry.backoff(attempt, response))
+                    continue
+
+                raise HTTPError(response.status_code, "{}: {}".format(
+                    response.status_code, response.content))
+
+            return response
 
     def get(self, url, **kwargs):
         return self.request('GET', url, **kwargs)
@@ -78,8 +329,8 @@ class HTTPSession(object):
     def delete(self, url, **kwargs):
         return self.request('DELETE', url, **kwargs)
 
-    def post(self, url, data=None, headers={}):
-        return self.request('POST', url, data=data, headers=headers)
+    def post(self, url, data=None, headers={}, **kwargs):
+        return self.request('POST', url, data=data, headers=headers, **kwargs)
 
     def put(self, url, data=None, **kwargs):
         return self.request('PUT', url, data=data, **kwargs)
@@ -8,19 +8,24 @@ This module contains common spreadsheets' models
 
 """
 
-import re
-from collections import defaultdict
+from array import array
+from bisect import bisect_left, insort
+from collections import namedtuple
+from copy import copy
 from itertools import chain
+from operator import attrgetter
 
 from xml.etree import ElementTree
 from xml.etree.ElementTree import Element, SubElement
 
 from . import urlencode
-from .ns import _ns, _ns1, ATOM_NS, BATCH_NS, SPREADSHEET_NS
+from .ns import _ns, _ns1, _ns2, ATOM_NS, BATCH_NS, SPREADSHEET_NS
 from .urls import construct_url
-from .utils import finditem, numericise_all
+from .utils import (finditem, parallel_map, prefetch,
+                    rowcol_to_a1, a1_to_rowcol, _column_label,
+                    _column_converters, _numericise_rows)
 
-from .exceptions import IncorrectCellLabel, WorksheetNotFound, CellNotFound
+from .exceptions import WorksheetNotFound, CellNotFound, RequestError
 
 
 try:
@@ -48,6 +53,168 @@ def _escape_attrib(text, encoding=None, replace=None):
 ElementTree._escape_attrib = _escape_attrib
 
 
+_BOUNDS_PARAMS = ('min-row', 'max-row', 'min-col', 'max-col')
+
+
+def _bounds(min_row=None, max_row=None, min_col=None, max_col=None):
+    """Returns the cells feed query parameters for a block of cells."""
+    params = dict((name, value) for name, value
+                  in zip(_BOUNDS_PARAMS, (min_row, max_row, min_col, max_col))
+                  if value is not None)
+    return params or None
+
+
+def _in_bounds(cell, params):
+    return (params.get('min-row', cell.row) <= cell.row <=
+            params.get('max-row', cell.row) and
+            params.get('min-col', cell.col) <= cell.col <=
+            params.get('max-col', cell.col))
+
+
+def _iter_rows(cells, first_row=1, first_col=1, value=attrgetter('value')):
+    """Groups cells ordered by rows, as in the cells feed, into lists of
+    values, yielding each row as soon as it is complete.
+
+    :param value: (optional) A function returning the value of a cell.
+
+    """
+    current, row = first_row, []
+    seen = False
+
+    for cell in cells:
+        seen = True
+
+        # the feed is ordered by rows, so a new row number means
+        # all previous rows are complete
+        while current < cell.row:
+            yield row
+            current, row = current + 1, []
+
+        col = cell.col - first_col + 1
+        row.extend([''] * (col - len(row) - 1))
+        row.append(value(cell))
+
+    if seen:
+        yield row
+
+
+def _pad_rows(rows):
+    # we return a whole rectangular region worth of cells, including
+    # empties
+    if not rows:
+        return []
+
+    width = max(len(row) for row in rows)
+    for row in rows:
+        row.extend([''] * (width - len(row)))
+
+    return rows
+
+
+def _records(data, empty2zero, head, schema=None):
+    idx = head - 1
+
+    keys = data[idx]
+    rows = data[idx + 1:]
+    converters = _column_converters(keys, rows, schema)
+    values = _numericise_rows(rows, converters, empty2zero)
+
+    return [dict(zip(keys, row)) for row in values]
+
+
+def _numeric_value(cell):
+    """Returns the number the server sent for a cell, or its value if
+    there's none.
+
+    """
+    number = cell.numeric_value
+    if number is None:
+        return cell.value
+    return int(number) if number.is_integer() else number
+
+
+def _record_value(head, schema):
+    """Returns a function reading the numeric values of record cells, for
+    get_all_records with `use_numeric_value`. Columns in a `schema` dict
+    keep the cells' values, so the schema takes precedence.
+
+    """
+    typed = schema if isinstance(schema, dict) else {}
+    keys = {}
+
+    def value(cell):
+        # the cells feed lists the `head` row before the records
+        if cell.row == head:
+            keys[cell.col] = cell.value
+        if cell.row <= head or keys.get(cell.col) in typed:
+            return cell.value
+        return _numeric_value(cell)
+
+    return value
+
+
+def _collect_columns(cells, head=0):
+    """Collects the values of the `cells` below the `head` row column by
+    column.
+
+    Returns a tuple of a dict mapping column numbers to ``[values,
+    numbers]`` pairs, the number of rows and a dict with the `head`
+    row's values. ``numbers`` holds the cells' numeric values and is
+    set to None as soon as the column turns out to contain text.
+
+    """
+    columns = {}
+    header = {}
+    height = 0
+
+    for cell in cells:
+        if cell.row <= head:
+            if cell.row == head:
+                header[cell.col] = cell.value
+            continue
+
+        index = cell.row - head - 1
+        column = columns.get(cell.col)
+        if column is None:
+            column = columns[cell.col] = [[], []]
+        values, numbers = column
+
+        gap = index - len(values)
+        if gap:
+            values.extend([''] * gap)
+            if numbers is not None:
+                numbers.extend([None] * gap)
+
+        values.append(cell.value)
+        if numbers is not None:
+            if cell.numeric_value is not None or cell.value == '':
+                numbers.append(cell.numeric_value)
+            else:
+                column[1] = None
+
+        height = index + 1
+
+    return columns, height, header
+
+
+def _matcher(query):
+    if isinstance(query, basestring):
+        return lambda x: x.value == query
+    else:
+        return lambda x: query.search(x.value)
+
+
+# Immutable snapshots of the metadata in worksheet and spreadsheet
+# entries. They are parsed once per entry instead of on every access.
+_WorksheetMetadata = namedtuple(
+    '_WorksheetMetadata', 'id title row_count col_count updated version')
+_SpreadsheetMetadata = namedtuple('_SpreadsheetMetadata', 'id title')
+
+
+def _entry_id(element):
+    return element.find(_ns('id')).text.split('/')[-1]
+
+
 class Spreadsheet(object):
 
     """ A class for a spreadsheet object."""
@@ -57,12 +224,24 @@ class Spreadsheet(object):
         self._sheet_list = []
         self._feed_entry = feed_entry
 
+    @property
+    def _feed_entry(self):
+        return self._entry
+
+    @_feed_entry.setter
+    def _feed_entry(self, feed_entry):
+        self._entry = feed_entry
+        self._metadata = _SpreadsheetMetadata(
+            id=_entry_id(feed_entry),
+            title=feed_entry.find(_ns('title')).text)
+        self._id_fields = {'spreadsheet_id': self._metadata.id}
+
     @property
     def id(self):
-        return self._feed_entry.find(_ns('id')).text.split('/')[-1]
+        return self._metadata.id
 
     def get_id_fields(self):
-        return {'spreadsheet_id': self.id}
+        return self._id_fields
 
     def _fetch_sheets(self):
         feed = self.client.get_worksheets_feed(self)
@@ -78,12 +257,7 @@ class Spreadsheet(object):
 
         Returns a newly created :class:`worksheets <Worksheet>`.
         """
-        feed = Element('entry', {'xmlns': ATOM_NS,
-                                 'xmlns:gs': SPREADSHEET_NS})
-
-        SubElement(feed, 'title').text = title
-        SubElement(feed, 'gs:rowCount').text = str(rows)
-        SubElement(feed, 'gs:colCount').text = str(cols)
+        feed = self._create_worksheet_feed(title, rows, cols)
 
         url = construct_url('worksheets', self)
         elem = self.client.post_feed(url, ElementTree.tostring(feed))
@@ -93,6 +267,16 @@ class Spreadsheet(object):
 
         return worksheet
 
+    def _create_worksheet_feed(self, title, rows, cols):
+        feed = Element('entry', {'xmlns': ATOM_NS,
+                                 'xmlns:gs': SPREADSHEET_NS})
+
+        SubElement(feed, 'title').text = title
+        SubElement(feed, 'gs:rowCount').text = str(rows)
+        SubElement(feed, 'gs:colCount').text = str(cols)
+
+        return feed
+
     def del_worksheet(self, worksheet):
         """Deletes a worksheet from a spreadsheet.
 
@@ -155,6 +339,41 @@ class Spreadsheet(object):
         except IndexError:
             return None
 
+    def map(self, func, workers=10):
+        """Calls `func` with every worksheet of the spreadsheet, using up to
+        `workers` threads, and returns a dict of the results keyed by
+        worksheet title.
+
+        The requests share the client's connection pool, so the session's
+        `pool_maxsize` should be at least `workers`.
+
+        :param func: A function taking a :class:`Worksheet`.
+        :param workers: (optional) Maximum number of worksheets processed
+                        at the same time.
+
+        Example. Counting the rows of every worksheet:
+
+        >>> sht.map(lambda wks: wks.row_count)
+        {'Sheet1': 1000, 'Annual bonuses': 50}
+
+        """
+        sheets = self.worksheets()
+        results = parallel_map(func, sheets, workers)
+
+        return dict((sheet.title, result)
+                    for sheet, result in zip(sheets, results))
+
+    def get_all_values_all_sheets(self, workers=10):
+        """Returns the values of all worksheets, as returned by
+        :meth:`Worksheet.get_all_values`, in a dict keyed by worksheet
+        title. The worksheets are read concurrently.
+
+        :param workers: (optional) Maximum number of worksheets read
+                        at the same time.
+
+        """
+        return self.map(lambda sheet: sheet.get_all_values(), workers)
+
     @property
     def sheet1(self):
         """Shortcut property for getting the first worksheet."""
@@ -162,7 +381,7 @@ class Spreadsheet(object):
 
     @property
     def title(self):
-        return self._feed_entry.find(_ns('title')).text
+        return self._metadata.title
 
     def __iter__(self):
         for sheet in self.worksheets():
@@ -176,49 +395,73 @@ class Worksheet(object):
     def __init__(self, spreadsheet, element):
         self.spreadsheet = spreadsheet
         self.client = spreadsheet.client
-        self._id = element.find(_ns('id')).text.split('/')[-1]
-        self._title = element.find(_ns('title')).text
         self._element = element
-        try:
-            self.version = self._get_link(
-                'edit', element).get('href').split('/')[-1]
-        except:
-            # not relevant for read-only spreadsheets
-            self.version = None
+        self._cells_cache = None
 
     def __repr__(self):
         return '<%s %s id:%s>' % (self.__class__.__name__,
                                   repr(self.title),
                                   self.id)
 
+    @property
+    def _element(self):
+        return self._entry
+
+    @_element.setter
+    def _element(self, element):
+        # resizing and refetching replace the entry, which refreshes the
+        # metadata snapshot
+        try:
+            version = self._get_link(
+                'edit', element).get('href').split('/')[-1]
+        except StopIteration:
+            # not relevant for read-only spreadsheets
+            version = None
+
+        self._entry = element
+        self._metadata = _WorksheetMetadata(
+            id=_entry_id(element),
+            title=element.find(_ns('title')).text,
+            row_count=int(element.find(_ns1('rowCount')).text),
+            col_count=int(element.find(_ns1('colCount')).text),
+            updated=element.find(_ns('updated')).text,
+            version=version)
+        self._id_fields = {'spreadsheet_id': self.spreadsheet.id,
+                           'worksheet_id': self._metadata.id}
+
     @property
     def id(self):
         """Id of a worksheet."""
-        return self._id
+        return self._metadata.id
 
     @property
     def title(self):
         """Title of a worksheet."""
-        return self._title
+        return self._metadata.title
 
     @property
     def row_count(self):
         """Number of rows"""
-        return int(self._element.find(_ns1('rowCount')).text)
+        return self._metadata.row_count
 
     @property
     def col_count(self):
         """Number of columns"""
-        return int(self._element.find(_ns1('colCount')).text)
+        return self._metadata.col_count
 
     @property
     def updated(self):
         """Updated time in RFC 3339 format"""
-        return self._element.find(_ns('updated')).text
+        return self._metadata.updated
+
+    @property
+    def version(self):
+        """Version of the worksheet entry, or None if the spreadsheet is
+        read-only."""
+        return self._metadata.version
 
     def get_id_fields(self):
-        return {'spreadsheet_id': self.spreadsheet.id,
-                'worksheet_id': self.id}
+        return self._id_fields
 
     def _cell_addr(self, row, col):
         return 'R%sC%s' % (row, col)
@@ -227,12 +470,74 @@ class Worksheet(object):
         return finditem(lambda x: x.get('rel') == link_type,
                         feed.findall(_ns('link')))
 
-    def _fetch_cells(self):
-        feed = self.client.get_cells_feed(self)
-        return [Cell(self, elem) for elem in feed.findall(_ns('entry'))]
+    def enable_cache(self):
+        """Keeps a local copy of the worksheet's cells.
+
+        Reading all cells, e.g. with :meth:`get_all_values`, :meth:`find`,
+        :meth:`row_values` or :meth:`col_values`, then only downloads the
+        cells feed if the worksheet has changed since it was last read.
+        The copy is revalidated with the feed's ETag or, if the server
+        doesn't send one, the worksheet's update time. Updating or resizing
+        the worksheet through this object drops the copy.
 
-    _MAGIC_NUMBER = 64
-    _cell_addr_re = re.compile(r'([A-Za-z]+)(\d+)')
+        The :class:`Cell` objects returned by lookups are copies, so
+        changing their values doesn't alter the cached cells.
+
+        """
+        if self._cells_cache is None:
+            self._cells_cache = _CellsCache()
+
+    def disable_cache(self):
+        """Drops the local copy of cells and stops caching them."""
+        self._cells_cache = None
+
+    def _invalidate_cache(self):
+        if self._cells_cache is not None:
+            self._cells_cache.clear()
+
+    def _fetch_updated(self):
+        self_uri = self._get_link('self', self._element).get('href')
+        self._element = self.client.get_feed(self_uri)
+        return self.updated
+
+    def _cached_cells(self):
+        cache = self._cells_cache
+        updated = None
+
+        if not cache.etag:
+            # without an ETag the worksheet's update time tells whether
+            # the cells have changed. It is fetched before the cells so
+            # that changes made in between are never missed.
+            updated = self._fetch_updated()
+            if cache.cells is not None and updated == cache.updated:
+                return cache.cells
+
+        etag, entries = self.client.iter_cells_feed_if_changed(self,
+                                                               cache.etag)
+        if entries is not None:
+            cache.cells = [Cell(self, elem) for elem in entries]
+            cache.etag = etag
+            cache.updated = updated
+
+        return cache.cells
+
+    def _own(self, cell):
+        # cached cells are shared between reads, so only the cells handed
+        # to callers are copied
+        if self._cells_cache is None:
+            return cell
+        return copy(cell)
+
+    def _iter_cells(self, params=None):
+        if (self._cells_cache is not None and
+                set(params or ()).issubset(_BOUNDS_PARAMS)):
+            for cell in self._cached_cells():
+                if not params or _in_bounds(cell, params):
+                    yield cell
+            return
+
+        for elem in self.client.iter_cells_feed(self, params=params):
+            yield Cell(self, elem)
 
     def get_int_addr(self, label):
         """Translates cell's label address to a tuple of integers.
@@ -248,18 +553,7 @@ class Worksheet(object):
         (1, 1)
 
         """
-        m = self._cell_addr_re.match(label)
-        if m:
-            column_label = m.group(1).upper()
-            row = int(m.group(2))
-
-            col = 0
-            for i, c in enumerate(reversed(column_label)):
-                col += (ord(c) - self._MAGIC_NUMBER) * (26 ** i)
-        else:
-            raise IncorrectCellLabel(label)
-
-        return (row, col)
+        return a1_to_rowcol(label)
 
     def get_addr_int(self, row, col):
         """Translates cell's tuple of integers to a cell label.
@@ -278,24 +572,7 @@ class Worksheet(object):
         A1
 
         """
-        row = int(row)
-        col = int(col)
-
-        if row < 1 or col < 1:
-            raise IncorrectCellLabel('(%s, %s)' % (row, col))
-
-        div = col
-        column_label = ''
-
-        while div:
-            (div, mod) = divmod(div, 26)
-            if mod == 0:
-                mod = 26
-                div -= 1
-            column_label = chr(mod + self._MAGIC_NUMBER) + column_label
-
-        label = '%s%s' % (column_label, row)
-        return label
+        return rowcol_to_a1(row, col)
 
     def acell(self, label):
         """Returns an instance of a :class:`Cell`.
@@ -328,6 +605,64 @@ class Worksheet(object):
                                                   self._cell_addr(row, col))
         return Cell(self, feed)
 
+    def cells(self, positions):
+        """Returns a list of :class:`Cell` objects at the given positions,
+        in the same order, reading all of them in a single batch request.
+
+        :param positions: A list of (row, col) tuples.
+
+        :raises gspread.RequestError: if a cell can't be read.
+
+        Example:
+
+        >>> wks.cells([(1, 1), (99, 26)])
+        [<Cell R1C1 "I'm cell A1">, <Cell R99C26 "I'm cell Z99">]
+
+        """
+        addrs = [self._cell_addr(row, col) for row, col in positions]
+        if not addrs:
+            return []
+
+        feed = self._create_query_feed(addrs)
+        response = self.client.post_cells(self, ElementTree.tostring(feed))
+
+        return self._read_query_response(addrs, response)
+
+    def _create_query_feed(self, addrs):
+        feed, cells_url = self._create_batch_feed()
+
+        queried = set()
+        for cell_addr in addrs:
+            if cell_addr not in queried:
+                queried.add(cell_addr)
+                self._add_batch_entry(feed, cells_url, cell_addr, 'query')
+
+        return feed
+
+    def _read_query_response(self, addrs, response):
+        cells = {}
+        for entry in response.findall(_ns('entry')):
+            status = entry.find(_ns2('status'))
+            if int(status.get('code')) != 200:
+                raise RequestError('%s: %s' % (status.get('code'),
+                                               status.get('reason')))
+            cells[entry.find(_ns2('id')).text] = Cell(self, entry)
+
+        try:
+            return [cells[cell_addr] for cell_addr in addrs]
+        except KeyError as ex:
+            raise RequestError('%s: Not processed' % ex.args[0])
+
+    def acells(self, labels):
+        """Returns a list of :class:`Cell` objects for the given labels, in
+        the same order, reading all of them in a single batch request.
+
+        :param labels: A list of cell labels in common format, e.g.
+                       ['A1', 'Z99'].
+
+        """
+        return self.cells([self.get_int_addr(label) for label in labels])
+
     def range(self, alphanum):
         """Returns a list of :class:`Cell` objects from specified range.
 
@@ -335,32 +670,151 @@ class Worksheet(object):
                          e.g. 'A1:A5'.
 
         """
-        feed = self.client.get_cells_feed(self, params={'range': alphanum,
-                                                        'return-empty': 'true'})
-        return [Cell(self, elem) for elem in feed.findall(_ns('entry'))]
+        return list(self._iter_cells(params={'range': alphanum,
+                                             'return-empty': 'true'}))
 
-    def get_all_values(self):
-        """Returns a list of lists containing all cells' values as strings."""
-        cells = self._fetch_cells()
+    def batch_get(self, ranges, workers=10):
+        """Returns a list of :class:`Cell` objects for every range in
+        `ranges`, in the same order. The ranges are requested concurrently.
 
-        # defaultdicts fill in gaps for empty rows/cells not returned by gdocs
-        rows = defaultdict(lambda: defaultdict(str))
-        for cell in cells:
-            row = rows.setdefault(int(cell.row), defaultdict(str))
-            row[cell.col] = cell.value
+        :param ranges: A list of strings with range values in common
+                       format, e.g. ['A1:C10', 'F1:F200'].
+        :param workers: (optional) Maximum number of ranges requested at
+                        the same time.
 
-        # we return a whole rectangular region worth of cells, including
-        # empties
-        if not rows:
-            return []
+        Example:
+
+        >>> header, totals = wks.batch_get(['A1:D1', 'A20:D20'])
+
+        """
+        return parallel_map(self.range, ranges, workers)
+
+    def iter_values(self, min_row=None, max_row=None,
+                    min_col=None, max_col=None):
+        """Yields the worksheet's values row by row as lists of strings.
+
+        The cells feed is streamed and parsed incrementally, so each row is
+        yielded as soon as it is complete, without waiting for the rest of
+        the feed. Empty rows are yielded as empty lists. Rows aren't padded
+        to a common width: every row ends at its last non-empty cell.
+
+        The optional bounds are the same as for :meth:`get_all_values`.
+
+        """
+        params = _bounds(min_row, max_row, min_col, max_col)
+
+        return _iter_rows(self._iter_cells(params=params),
+                          min_row or 1, min_col or 1)
+
+    def _row_windows(self, first_row, batch_rows):
+        """Reads the worksheet `batch_rows` rows at a time, starting at
+        `first_row`, and yields the rows of values of each window.
+
+        Empty rows are held back until a non-empty row follows them, so
+        trailing empty rows are never yielded.
+
+        """
+        empty = 0
+        for min_row in range(first_row, self.row_count + 1, batch_rows):
+            max_row = min(min_row + batch_rows - 1, self.row_count)
+            cells = self._iter_cells(params=_bounds(min_row, max_row))
+            rows = list(_iter_rows(cells, min_row))
+
+            if rows:
+                yield [[] for i in range(empty)] + rows
+                empty = 0
+
+            empty += max_row - min_row + 1 - len(rows)
+
+    def iter_rows(self, batch_rows=1000, records=False, head=1,
+                  empty2zero=False, read_ahead=0):
+        """Yields the worksheet's rows, reading `batch_rows` rows at a time
+        so that memory use doesn't depend on the size of the worksheet.
+
+        Rows are lists of values padded to the worksheet's width. Trailing
+        empty rows are skipped, as in :meth:`get_all_values`.
+
+        :param batch_rows: (optional) Number of rows requested at once.
+        :param records: (optional) If True, rows are yielded as
+                        dictionaries keyed by the `head` row, as returned
+                        by :meth:`get_all_records`. Values in columns
+                        beyond the `head` row are kept under a '' key,
+                        which only appears in the records of windows
+                        holding such values.
+        :param head: (optional) Row used as keys in records mode.
+        :param empty2zero: (optional) Whether empty cells are converted to
+                           zeros in records mode.
+        :param read_ahead: (optional) Number of windows fetched and parsed
+                           in a background thread while the caller
+                           processes the current one. Windows are read only
+                           when they are needed by default.
+
+        Example:
+
+        >>> for record in wks.iter_rows(batch_rows=500, records=True,
+        ...                             read_ahead=2):
+        ...     process(record)
+
+        """
+        keys = None
 
-        all_row_keys = chain.from_iterable(row.keys() for row in rows.values())
-        rect_cols = range(1, max(all_row_keys) + 1)
-        rect_rows = range(1, max(rows.keys()) + 1)
+        windows = self._row_windows(head if records else 1, batch_rows)
+        if read_ahead:
+            windows = prefetch(windows, read_ahead)
 
-        return [[rows[i][j] for j in rect_cols] for i in rect_rows]
+        for rows in windows:
+            keys, rows = self._shape_window(rows, keys, records, empty2zero)
+            for row in rows:
+                yield row
 
-    def get_all_records(self, empty2zero=False, head=1):
+    def _shape_window(self, rows, keys, records, empty2zero):
+        """Pads the rows of a window read by :meth:`iter_rows`, or turns
+        them into records keyed by `keys`, the head row. Returns the keys,
+        taken from the first window, and the rows.
+
+        """
+        width = self.col_count
+        if records:
+            if keys is None:
+                keys, rows = rows[0], rows[1:]
+
+            # like get_all_records, values beyond the head row are
+            # kept under a '' key
+            width = max([len(keys)] + [len(row) for row in rows])
+
+        for row in rows:
+            row.extend([''] * (width - len(row)))
+
+        if records:
+            window_keys = keys + [''] * (width - len(keys))
+            rows = _records([window_keys] + rows, empty2zero, 1)
+
+        return keys, rows
+
+    def get_all_values(self, min_row=None, max_row=None,
+                       min_col=None, max_col=None):
+        """Returns a list of lists containing all cells' values as strings.
+
+        The optional bounds restrict the cells requested from the server
+        to a block of rows and columns. The first list then holds the
+        values of row `min_row`, starting at column `min_col`.
+
+        :param min_row: (optional) First row to read.
+        :param max_row: (optional) Last row to read.
+        :param min_col: (optional) First column to read.
+        :param max_col: (optional) Last column to read.
+
+        Example. Reading the third column only:
+
+        >>> wks.get_all_values(min_col=3, max_col=3)
+        [['Price'], ['10'], ['12.5']]
+
+        """
+        return _pad_rows(list(self.iter_values(min_row, max_row,
+                                               min_col, max_col)))
+
+    def get_all_records(self, empty2zero=False, head=1, schema=None,
+                        use_numeric_value=False):
         """Returns a list of dictionaries, all of them having:
             - the contents of the spreadsheet's with the head row as keys,
             And each of these dictionaries holding
@@ -372,15 +826,135 @@ class Worksheet(object):
 
         :param empty2zero: determines whether empty cells are converted to zeros.
         :param head: determines wich row to use as keys, starting from 1
-            following the numeration of the spreadsheet."""
+            following the numeration of the spreadsheet.
+        :param schema: (optional) 'infer' to pick the fastest way to convert
+            each column from a sample of its values, without changing the
+            result. Or a dict of functions such as int, float or str by key,
+            to convert known columns without guessing. Values a function
+            raises ValueError for are numericised instead.
+        :param use_numeric_value: (optional) If True, numbers are taken from
+            the numeric values the server sends for numeric cells, so
+            formatted numbers like '1,000' or '50%' are converted too.
+            Columns in a `schema` dict are still converted from the
+            cells' values.
+
+        Example:
 
-        idx = head - 1
+        >>> wks.get_all_records(schema={'name': str, 'price': float})
+        [{'name': 'pen', 'price': 1.5}, {'name': 'ink', 'price': 3.0}]
 
-        data = self.get_all_values()
-        keys = data[idx]
-        values = [numericise_all(row, empty2zero) for row in data[idx + 1:]]
+        """
+        if use_numeric_value:
+            value = _record_value(head, schema)
+            data = _pad_rows(list(_iter_rows(self._iter_cells(),
+                                             value=value)))
+        else:
+            data = self.get_all_values()
+
+        return _records(data, empty2zero, head, schema)
 
-        return [dict(zip(keys, row)) for row in values]
+    def _fetch_columns(self, head=0):
+        """Collects the values of all rows below the `head` row column by
+        column, as returned by :func:`_collect_columns`.
+
+        """
+        return _collect_columns(
+            self._iter_cells(params=_bounds(min_row=head or None)), head)
+
+    def _build_arrays(self, names, columns, height, empty2zero, use_numpy):
+        empty_number = 0.0 if empty2zero else float('nan')
+        empty_value = 0 if empty2zero else ''
+
+        result = []
+        for col, name in names:
+            values, numbers = columns.get(col, ([], None))
+            gap = height - len(values)
+
+            if numbers is not None:
+                numbers.extend([None] * gap)
+                data = array('d', [empty_number if n is None else n
+                                   for n in numbers])
+            else:
+                values.extend([''] * gap)
+                if empty2zero:
+                    values = [v if v != '' else empty_value for v in values]
+                data = values
+
+            result.append((name, data))
+
+        if not use_numpy:
+            return dict(result)
+
+        import numpy
+
+        # NumPy needs unique, non-empty field names
+        fields = []
+        for col, name in names:
+            field = str(name)
+            if not field or field in fields:
+                field = _column_label(col)
+            if field in fields:
+                raise ValueError("Column %s has a duplicate field name %r"
+                                 % (_column_label(col), field))
+            fields.append(field)
+
+        dtype = [(field, 'f8' if isinstance(data, array) else 'O')
+                 for field, (_, data) in zip(fields, result)]
+        structured = numpy.empty(height, dtype=dtype)
+        for field, (_, data) in zip(fields, result):
+            structured[field] = data
+
+        return structured
+
+    def get_all_values_array(self, use_numpy=False):
+        """Returns all cells' values column by column.
+
+        The result is a dict mapping column labels ('A', 'B', ...) to the
+        columns' values. Columns whose non-empty cells all have a numeric
+        value, as reported by the server, are returned as ``array('d')``
+        with empty cells set to NaN. Other columns are lists of strings.
+
+        :param use_numpy: If True, a NumPy structured array with a field
+                          per column is returned instead. Requires NumPy.
+
+        """
+        return self._values_array(self._fetch_columns(), use_numpy)
+
+    def _values_array(self, fetched, use_numpy):
+        columns, height, _ = fetched
+        width = max(columns) if columns else 0
+        names = [(col, _column_label(col)) for col in range(1, width + 1)]
+
+        return self._build_arrays(names, columns, height, False, use_numpy)
+
+    def get_all_records_array(self, empty2zero=False, head=1,
+                              use_numpy=False):
+        """Returns all records column by column, the columnar counterpart of
+        :meth:`get_all_records`.
+
+        The result is a dict mapping the `head` row's values to the
+        columns' values. Columns are typed as described in
+        :meth:`get_all_values_array`.
+
+        :param empty2zero: determines whether empty cells are converted to zeros.
+        :param head: determines wich row to use as keys, starting from 1
+            following the numeration of the spreadsheet.
+        :param use_numpy: If True, a NumPy structured array with a field
+                          per column is returned instead. Requires NumPy.
+                          Columns with an empty or repeated header are
+                          named by their column label, e.g. 'C'.
+
+        """
+        return self._records_array(self._fetch_columns(head), empty2zero,
+                                   use_numpy)
+
+    def _records_array(self, fetched, empty2zero, use_numpy):
+        columns, height, header = fetched
+        width = max(chain(columns, header, [0]))
+        names = [(col, header.get(col, '')) for col in range(1, width + 1)]
+
+        return self._build_arrays(names, columns, height, empty2zero,
+                                  use_numpy)
 
     def row_values(self, row):
         """Returns a list of all values in a `row`.
@@ -388,6 +962,13 @@ class Worksheet(object):
         Empty cells in this list will be rendered as :const:`None`.
 
         """
+        if self._cells_cache is not None:
+            values = [''] * self.col_count
+            for cell in self._cached_cells():
+                if cell.row == row and cell.col <= len(values):
+                    values[cell.col - 1] = cell.value
+            return values
+
         start_cell = self.get_addr_int(row, 1)
         end_cell = self.get_addr_int(row, self.col_count)
 
@@ -400,6 +981,13 @@ class Worksheet(object):
         Empty cells in this list will be rendered as :const:`None`.
 
         """
+        if self._cells_cache is not None:
+            values = [''] * self.row_count
+            for cell in self._cached_cells():
+                if cell.col == col and cell.row <= len(values):
+                    values[cell.row - 1] = cell.value
+            return values
+
         start_cell = self.get_addr_int(1, col)
         end_cell = self.get_addr_int(self.row_count, col)
 
@@ -429,6 +1017,8 @@ class Worksheet(object):
         :param val: New value.
 
         """
+        self._invalidate_cache()
+
         feed = self.client.get_cells_cell_id_feed(self,
                                                   self._cell_addr(row, col))
         cell_elem = feed.find(_ns1('cell'))
@@ -437,43 +1027,147 @@ class Worksheet(object):
 
         self.client.put_feed(uri, ElementTree.tostring(feed))
 
-    def _create_update_feed(self, cell_list):
+    def _create_batch_feed(self):
         feed = Element('feed', {'xmlns': ATOM_NS,
                                 'xmlns:batch': BATCH_NS,
                                 'xmlns:gs': SPREADSHEET_NS})
 
         id_elem = SubElement(feed, 'id')
 
-        id_elem.text = construct_url('cells', self)
+        cells_url = construct_url('cells', self)
+        id_elem.text = cells_url
 
-        for cell in cell_list:
-            entry = SubElement(feed, 'entry')
+        return feed, cells_url
+
+    def _add_batch_entry(self, feed, cells_url, cell_addr, operation):
+        entry = SubElement(feed, 'entry')
+
+        # cell entry urls are the cells feed url followed by the cell
+        # address, so there's no need to keep them around in every Cell
+        cell_url = '%s/%s' % (cells_url, cell_addr)
 
-            SubElement(entry, 'batch:id').text = cell.element.find(
-                _ns('title')).text
-            SubElement(entry, 'batch:operation', {'type': 'update'})
-            SubElement(entry, 'id').text = cell.element.find(_ns('id')).text
+        SubElement(entry, 'batch:id').text = cell_addr
+        SubElement(entry, 'batch:operation', {'type': operation})
+        SubElement(entry, 'id').text = cell_url
 
-            edit_link = finditem(lambda x: x.get('rel') == 'edit',
-                                 cell.element.findall(_ns('link')))
+        return entry, cell_url
+
+    def _create_update_feed(self, cell_list):
+        feed, cells_url = self._create_batch_feed()
 
+        for cell in cell_list:
+            cell_addr = self._cell_addr(cell.row, cell.col)
+            entry, cell_url = self._add_batch_entry(feed, cells_url,
+                                                    cell_addr, 'update')
+            edit_url = cell_url
+            if cell.version is not None:
+                edit_url = '%s/%s' % (cell_url, cell.version)
             SubElement(entry, 'link', {'rel': 'edit',
-                                       'type': edit_link.get('type'),
-                                       'href': edit_link.get('href')})
+                                       'type': 'application/atom+xml',
+                                       'href': edit_url})
 
             SubElement(entry, 'gs:cell', {'row': str(cell.row),
                                           'col': str(cell.col),
                                           'inputValue': unicode(cell.value)})
         return feed
 
-    def update_cells(self, cell_list):
+    def _batches(self, cell_list, batch_size):
+        if batch_size:
+            return [cell_list[i:i + batch_size]
+                    for i in range(0, len(cell_list), batch_size)]
+        else:
+            return [cell_list]
+
+    def _post_batches(self, cell_list, batch_size, workers):
+        def post_batch(batch):
+            feed = self._create_update_feed(batch)
+            response = self.client.post_cells(self, ElementTree.tostring(feed))
+            return response.findall(_ns('entry'))
+
+        batches = self._batches(cell_list, batch_size)
+        return chain.from_iterable(parallel_map(post_batch, batches, workers))
+
+    def _read_batch_response(self, result, pending, entries):
+        """Sorts the `pending` cells into `result` by the batch response
+        `entries` and returns the failed cells.
+
+        """
+        cells = dict((self._cell_addr(c.row, c.col), c) for c in pending)
+        result.failed = []
+
+        for entry in entries:
+            cell = cells.pop(entry.find(_ns2('id')).text, None)
+            if cell is None:
+                continue
+
+            status = entry.find(_ns2('status'))
+            code = int(status.get('code'))
+            if code == 200:
+                cell._saved(entry)
+                result.succeeded.append(cell)
+            else:
+                result.failed.append((cell, code, status.get('reason')))
+
+        # cells missing from the response weren't processed, e.g.
+        # because the batch was interrupted
+        result.failed.extend((cell, None, 'Not processed')
+                             for cell in cells.values())
+
+        return [cell for cell, code, reason in result.failed]
+
+    def _modified_cells(self, result, cell_list, changed_only):
+        if changed_only:
+            pending = [cell for cell in cell_list if cell.modified]
+            result.skipped = len(cell_list) - len(pending)
+        else:
+            pending = cell_list
+
+        # batch entries are matched to cells by address, so a position
+        # may only be written once per update
+        positions = set()
+        for cell in pending:
+            position = _position(cell)
+            if position in positions:
+                raise ValueError("Cell %s is updated more than once"
+                                 % self.get_addr_int(*position))
+            positions.add(position)
+
+        return pending
+
+    def update_cells(self, cell_list, batch_size=None, workers=1, retries=0,
+                     changed_only=True):
         """Updates cells in batch.
 
         :param cell_list: List of a :class:`Cell` objects to update.
+        :param batch_size: (optional) Maximum number of cells sent in one
+                           request. By default all cells are sent at once.
+        :param workers: (optional) Number of requests sent concurrently
+                        when the update is split into several batches.
+        :param retries: (optional) Number of times the cells the server
+                        failed to update are sent again.
+        :param changed_only: (optional) If True, cells whose value wasn't
+                             modified are skipped. Set it to False to write
+                             all cells.
+
+        Returns an :class:`UpdateResult` with the cells that were and
+        weren't updated.
+
+        :raises ValueError: if several cells to update share a position.
 
         """
-        feed = self._create_update_feed(cell_list)
-        self.client.post_cells(self, ElementTree.tostring(feed))
+        self._invalidate_cache()
+
+        result = UpdateResult()
+        pending = self._modified_cells(result, cell_list, changed_only)
+
+        for attempt in range(retries + 1):
+            if not pending:
+                break
+
+            entries = self._post_batches(pending, batch_size, workers)
+            pending = self._read_batch_response(result, pending, entries)
+
+        return result
 
     def resize(self, rows=None, cols=None):
         """Resizes the worksheet.
@@ -484,10 +1178,17 @@ class Worksheet(object):
         if rows is None and cols is None:
             raise TypeError("Either 'rows' or 'cols' should be specified.")
 
+        self._invalidate_cache()
+
         self_uri = self._get_link('self', self._element).get('href')
         feed = self.client.get_feed(self_uri)
         uri = self._get_link('edit', feed).get('href')
+        self._set_size(feed, rows, cols)
 
+        # Send request and store result
+        self._element = self.client.put_feed(uri, ElementTree.tostring(feed))
+
+    def _set_size(self, feed, rows, cols):
         if rows:
             elem = feed.find(_ns1('rowCount'))
             elem.text = str(rows)
@@ -496,9 +1197,6 @@ class Worksheet(object):
             elem = feed.find(_ns1('colCount'))
             elem.text = str(cols)
 
-        # Send request and store result
-        self._element = self.client.put_feed(uri, ElementTree.tostring(feed))
-
     def add_rows(self, rows):
         """Adds rows to worksheet.
 
@@ -522,19 +1220,73 @@ class Worksheet(object):
 
         :param values: List of values for the new row.
         """
-        self.add_rows(1)
-        new_row = self.row_count
-        data_width = len(values)
-        if self.col_count < data_width:
-            self.resize(cols=data_width)
+        return self.append_rows([values])
+
+    def append_rows(self, rows):
+        """Adds rows to the worksheet and populates them with values.
+        Widens the worksheet if there are more values than columns.
+
+        The worksheet is resized once and all values are written in a
+        single batch, so the number of requests doesn't depend on the
+        number of rows or values.
+
+        :param rows: List of lists of values for the new rows.
+        """
+        if not rows:
+            return
 
+        first_row = self.row_count + 1
+        data_width = max(len(values) for values in rows)
+        self.resize(rows=self.row_count + len(rows),
+                    cols=data_width if self.col_count < data_width else None)
+
+        if not data_width:
+            return
+
+        # Retrieve the new Cells using a single batch query
+        top_left = self.get_addr_int(first_row, 1)
+        bottom_right = self.get_addr_int(first_row + len(rows) - 1,
+                                         data_width)
+        cells = self.range('%s:%s' % (top_left, bottom_right))
+
+        return self.update_cells(self._fill_cells(cells, rows, first_row))
+
+    def _fill_cells(self, cells, rows, first_row):
         cell_list = []
-        for i, value in enumerate(values, start=1):
-            cell = self.cell(new_row, i)
-            cell.value = value
-            cell_list.append(cell)
+        for cell in cells:
+            values = rows[cell.row - first_row]
+            if cell.col <= len(values):
+                cell.value = values[cell.col - 1]
+                cell_list.append(cell)
+
+        return cell_list
 
-        self.update_cells(cell_list)
+    def _shift_cells(self, cells, rows, index):
+        """Sets the values `cells` take when `rows` are inserted at
+        `index`, returning the cells whose value changes.
+
+        """
+        count = len(rows)
+        old_values = dict((_position(cell), cell.value) for cell in cells)
+        changed = []
+
+        for cell in cells:
+            if cell.row < index + count:
+                # new rows take their values from `rows`
+                values = rows[cell.row - index]
+                new_value = (values[cell.col - 1]
+                             if cell.col <= len(values) else '')
+            else:
+                # other rows take the values from `count` rows above
+                new_value = old_values[(cell.row - count, cell.col)]
+
+            # formula cells always count as changed, even if their
+            # displayed value matches
+            if unicode(new_value) != (cell.input_value or ''):
+                cell.value = new_value
+                changed.append(cell)
+
+        return changed
 
     def insert_row(self, values, index=1):
         """"Adds a row to the worksheet at the specified index and populates it with values.
@@ -542,66 +1294,102 @@ class Worksheet(object):
 
         :param values: List of values for the new row.
         """
+        return self.insert_rows([values], index)
+
+    def insert_rows(self, rows, index=1, batch_size=1000):
+        """Inserts rows at the specified index and populates them with
+        values, moving the rows below down. Widens the worksheet if there
+        are more values than columns.
+
+        The worksheet is resized once and the cells below `index` are read
+        in a single request. Only the cells whose value changes are
+        written, so inserting rows above sparse or repetitive data sends
+        far fewer cells than the whole region.
+
+        :param rows: List of lists of values for the new rows.
+        :param index: (optional) Row number of the first new row.
+        :param batch_size: (optional) Maximum number of cells sent in one
+                           request.
+
+        Returns an :class:`UpdateResult`.
+        """
+        if not rows:
+            return
+
         if index == self.row_count + 1:
-            return self.append_row(values)
+            return self.append_rows(rows)
         elif index > self.row_count + 1:
             raise IndexError('Row index out of range')
 
-        self.add_rows(1)
-        data_width = len(values)
-        if self.col_count < data_width:
-            self.resize(cols=data_width)
+        count = len(rows)
+        data_width = max(len(values) for values in rows)
+        self.resize(rows=self.row_count + count,
+                    cols=data_width if self.col_count < data_width else None)
 
         # Retrieve all Cells at or below `index` using a single batch query
         top_left = self.get_addr_int(index, 1)
         bottom_right = self.get_addr_int(self.row_count, self.col_count)
-        range_str = '%s:%s' % (top_left, bottom_right)
+        cells = self.range('%s:%s' % (top_left, bottom_right))
 
-        cells_after_insert = self.range(range_str)
+        changed = self._shift_cells(cells, rows, index)
 
-        for ind, cell in reversed(list(enumerate(cells_after_insert))):
-            if ind < self.col_count:
-                # For the first row, take the cell values from `values`
-                new_val = values[ind] if ind < len(values) else ''
-            else:
-                # For all other rows, take the cell values from the row above
-                new_val = cells_after_insert[ind - self.col_count].value
-            cell.value = new_val
+        return self.update_cells(changed, batch_size=batch_size)
 
-        self.update_cells(cells_after_insert)
+    def _finder(self, func, query, in_row=None, in_column=None):
+        cells = self._iter_cells(
+            params=_bounds(in_row, in_row, in_column, in_column))
 
-    def _finder(self, func, query):
-        cells = self._fetch_cells()
+        return func(_matcher(query), cells)
 
-        if isinstance(query, basestring):
-            match = lambda x: x.value == query
-        else:
-            match = lambda x: query.search(x.value)
-
-        return func(match, cells)
-
-    def find(self, query):
+    def find(self, query, in_row=None, in_column=None):
         """Finds first cell matching query.
 
         :param query: A text string or compiled regular expression.
+        :param in_row: (optional) Row number to search in. Only this row's
+                       cells are requested from the server.
+        :param in_column: (optional) Column number to search in. Only this
+                          column's cells are requested from the server.
         """
         try:
-            return self._finder(finditem, query)
+            return self._own(self._finder(finditem, query, in_row,
+                                          in_column))
         except StopIteration:
             raise CellNotFound(query)
 
-    def findall(self, query):
+    def findall(self, query, in_row=None, in_column=None):
         """Finds all cells matching query.
 
         :param query: A text string or compiled regular expression.
+        :param in_row: (optional) Row number to search in.
+        :param in_column: (optional) Column number to search in.
         """
-        return list(self._finder(filter, query))
+        return [self._own(cell)
+                for cell in self._finder(filter, query, in_row, in_column)]
+
+    def build_index(self, columns=None):
+        """Reads the worksheet's cells once and returns a :class:`CellIndex`
+        for repeated lookups by value.
+
+        :param columns: (optional) List of column numbers to index. All
+                        columns are indexed by default.
+
+        Example:
+
+        >>> index = wks.build_index(columns=[1])
+        >>> index.find('Dough')
+        <Cell R3C1 'Dough'>
+
+        """
+        return CellIndex(self, columns)
 
     def export(self, format='csv'):
         """Export the worksheet in specified format.
 
         :param format: A format of the output.
         """
+        return self.client.session.get(self._export_url(format)).content
+
+    def _export_url(self, format):
         export_link = self._get_link(
             'http://schemas.google.com/spreadsheets/2006#exportcsv',
             self._element).get('href')
@@ -612,9 +1400,153 @@ class Worksheet(object):
         params['format'] = format
 
         params = urlencode(params)
-        export_link = '%s?%s' % (url, params)
+        return '%s?%s' % (url, params)
+
+
+def _position(cell):
+    return (cell.row, cell.col)
+
+
+class CellIndex(object):
+
+    """An index mapping the values of a :class:`worksheet <Worksheet>`'s
+    cells to the cells.
+
+    Exact lookups are dict lookups and prefix lookups are binary searches
+    over the sorted values, so no cells are downloaded or scanned. Use
+    :meth:`Worksheet.build_index` to create an index.
+
+    """
+
+    def __init__(self, worksheet, columns=None):
+        self.worksheet = worksheet
+        self.columns = frozenset(columns) if columns else None
+
+        self._by_value = {}
+        self._by_position = {}
+        self._values = []
 
-        return self.client.session.get(export_link).content
+        self.refresh()
+
+    def refresh(self):
+        """Reads the worksheet's cells again and rebuilds the index.
+
+        With :meth:`Worksheet.enable_cache`, an unchanged worksheet isn't
+        downloaded again.
+
+        """
+        self._load(self.worksheet._iter_cells(params=self._params()))
+
+    def _params(self):
+        # only the span of indexed columns is requested
+        if self.columns is None:
+            return None
+        return _bounds(min_col=min(self.columns), max_col=max(self.columns))
+
+    def _load(self, cells):
+        self._by_value = {}
+        self._by_position = {}
+        self._values = []
+
+        # the values are sorted once, rather than kept sorted cell by cell
+        self._add(cells, keep_sorted=False, own=self.worksheet._own)
+        self._values = sorted(self._by_value)
+
+    def update(self, cells):
+        """Updates the index with the current values of `cells`, replacing
+        whatever was indexed at their positions.
+
+        :param cells: An iterable of :class:`Cell` objects, e.g. the cells
+                      just written with :meth:`Worksheet.update_cells`.
+
+        """
+        self._add(cells, keep_sorted=True)
+
+    def _add(self, cells, keep_sorted, own=None):
+        for cell in cells:
+            if self.columns is not None and cell.col not in self.columns:
+                continue
+
+            position = _position(cell)
+            indexed = self._by_position.pop(position, None)
+            if indexed is not None:
+                self._remove(*indexed)
+
+            value = cell.value
+            if value == '':
+                continue
+
+            if own is not None:
+                cell = own(cell)
+            self._by_position[position] = (value, cell)
+
+            bucket = self._by_value.get(value)
+            if bucket is None:
+                bucket = self._by_value[value] = []
+                if keep_sorted:
+                    insort(self._values, value)
+            bucket.append(cell)
+
+    def _remove(self, value, cell):
+        bucket = self._by_value[value]
+        bucket.remove(cell)
+        if not bucket:
+            del self._by_value[value]
+            i = bisect_left(self._values, value)
+            if i < len(self._values) and self._values[i] == value:
+                del self._values[i]
+
+    def find(self, value):
+        """Finds first cell with `value`.
+
+        :param value: A text string.
+        """
+        try:
+            return min(self._by_value[value], key=_position)
+        except KeyError:
+            raise CellNotFound(value)
+
+    def findall(self, value):
+        """Finds all cells with `value`.
+
+        :param value: A text string.
+        """
+        return sorted(self._by_value.get(value, ()), key=_position)
+
+    def find_prefix(self, prefix):
+        """Finds all cells whose values start with `prefix`.
+
+        :param prefix: A text string.
+        """
+        cells = []
+        i = bisect_left(self._values, prefix)
+        while i < len(self._values) and self._values[i].startswith(prefix):
+            cells.extend(self._by_value[self._values[i]])
+            i += 1
+
+        return sorted(cells, key=_position)
+
+    def __contains__(self, value):
+        return value in self._by_value
+
+    def __len__(self):
+        return len(self._by_position)
+
+
+class _CellsCache(object):
+
+    """Local copy of a worksheet's cells along with the ETag or the
+    worksheet update time they were fetched at.
+
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.cells = None
+        self.etag = None
+        self.updated = None
 
 
 class Cell(object):
@@ -622,10 +1554,21 @@ class Cell(object):
     """An instance of this class represents a single cell
     in a :class:`worksheet <Worksheet>`.
 
+    Only the cell's coordinates, values and `version`, the last part
+    of the cell entry's edit link (None for GData 3.0 entries, whose edit
+    links have no version), are kept. The feed entry the cell was
+    created from isn't retained.
+
+    Assigning :attr:`value` marks the cell as :attr:`modified` when the new
+    value differs from the cell's input value, so that
+    :meth:`Worksheet.update_cells` only sends cells that were changed.
+
     """
 
+    __slots__ = ('_row', '_col', '_value', '_assigned', 'input_value',
+                 'numeric_value', 'version')
+
     def __init__(self, worksheet, element):
-        self.element = element
         cell_elem = element.find(_ns1('cell'))
         self._row = int(cell_elem.get('row'))
         self._col = int(cell_elem.get('col'))
@@ -633,8 +1576,50 @@ class Cell(object):
         numeric_value = cell_elem.get('numericValue')
         self.numeric_value = float(numeric_value) if numeric_value else None
 
-        #: Value of the cell.
-        self.value = cell_elem.text or ''
+        self._value = cell_elem.text or ''
+        self._assigned = False
+
+        self._update_version(element)
+
+    def _update_version(self, element):
+        try:
+            version = finditem(lambda x: x.get('rel') == 'edit',
+                               element.findall(_ns('link'))
+                               ).get('href').split('/')[-1]
+        except StopIteration:
+            # not relevant for read-only spreadsheets
+            version = None
+
+        # GData 3.0 edit links end with the cell id instead of a version
+        if version == 'R%sC%s' % (self._row, self._col):
+            version = None
+        self.version = version
+
+    def _saved(self, element):
+        """Marks the cell's value as written, as in the response `element`.
+        """
+        self._update_version(element)
+        self.input_value = unicode(self._value)
+        self._assigned = False
+
+    @property
+    def value(self):
+        """Value of the cell."""
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        self._value = value
+        self._assigned = True
+
+    @property
+    def modified(self):
+        """Whether :attr:`value` was set to something other than the cell's
+        input value since the cell was read or last updated.
+
+        """
+        return (self._assigned and
+                unicode(self._value) != (self.input_value or ''))
 
     @property
     def row(self):
@@ -651,3 +1636,33 @@ class Cell(object):
                                    self.row,
                                    self.col,
                                    repr(self.value))
+
+
+class UpdateResult(object):
+
+    """An instance of this class holds the outcome of
+    :meth:`Worksheet.update_cells`.
+
+    """
+
+    def __init__(self):
+        #: List of the :class:`Cell` objects that were updated.
+        self.succeeded = []
+
+        #: List of ``(cell, code, reason)`` tuples for the cells the
+        #: server failed to update. `code` is None for cells the server
+        #: didn't process at all.
+        self.failed = []
+
+        #: Number of cells that weren't sent because they weren't modified.
+        self.skipped = 0
+
+    def __bool__(self):
+        return not self.failed
+
+    __nonzero__ = __bool__
+
+    def __repr__(self):
+        return '<%s succeeded:%s failed:%s skipped:%s>' % (
+            self.__class__.__name__, len(self.succeeded), len(self.failed),
+            self.skipped)
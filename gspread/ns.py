@@ -20,3 +20,7 @@ def _ns(name):
 
 def _ns1(name):
     return '{%s}%s' % (SPREADSHEET_NS, name)
+
+
+def _ns2(name):
+    return '{%s}%s' % (BATCH_NS, name)
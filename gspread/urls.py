@@ -33,6 +33,7 @@ SPREADSHEETS_FEED_URL = 'https://%s/%s/' % (SPREADSHEETS_SERVER, 'feeds')
 # /feeds/cells/key/worksheetId/visibility/projection/cellId
 
 _feed_types = {'spreadsheets': 'spreadsheets/{visibility}/{projection}',
+               'spreadsheet': 'spreadsheets/{visibility}/{projection}/{spreadsheet_id}',
                'worksheets': 'worksheets/{spreadsheet_id}/{visibility}/{projection}',
                'worksheet': 'worksheets/{spreadsheet_id}/{visibility}/{projection}/{worksheet_id}/{version}',
                'cells': 'cells/{spreadsheet_id}/{worksheet_id}/{visibility}/{projection}',
@@ -41,6 +42,10 @@ _feed_types = {'spreadsheets': 'spreadsheets/{visibility}/{projection}',
 
 _fields_cache = {}
 
+# urls of feeds other than single cells, by feed type and ids
+_url_cache = {}
+_URL_CACHE_SIZE = 1024
+
 
 _field_re = re.compile(r'{(\w+)}')
 
@@ -70,19 +75,36 @@ def construct_url(feedtype=None,
 
     obj_fields = obj.get_id_fields() if obj is not None else {}
 
+    spreadsheet_id = spreadsheet_id or obj_fields.get('spreadsheet_id')
+    worksheet_id = worksheet_id or obj_fields.get('worksheet_id')
+
+    # cell urls are rarely requested twice, so only the others are kept
+    key = None
+    if cell_id is None:
+        key = (feedtype, visibility, projection, spreadsheet_id,
+               worksheet_id, worksheet_version)
+        url = _url_cache.get(key)
+        if url is not None:
+            return url
+
     params = {'visibility': visibility,
               'projection': projection,
-              'spreadsheet_id': (spreadsheet_id if spreadsheet_id
-                                 else obj_fields.get('spreadsheet_id')),
-              'worksheet_id': (worksheet_id if worksheet_id
-                               else obj_fields.get('worksheet_id')),
+              'spreadsheet_id': spreadsheet_id,
+              'worksheet_id': worksheet_id,
               'cell_id': cell_id,
               'version': worksheet_version}
 
     params = dict((k, v) for k, v in params.items() if v is not None)
 
     try:
-        return '%s%s' % (SPREADSHEETS_FEED_URL,
-                         urlpattern.format(**params))
+        url = '%s%s' % (SPREADSHEETS_FEED_URL,
+                        urlpattern.format(**params))
     except KeyError as e:
         raise UrlParameterMissing(e)
+
+    if key is not None:
+        if len(_url_cache) >= _URL_CACHE_SIZE:
+            _url_cache.clear()
+        _url_cache[key] = url
+
+    return url
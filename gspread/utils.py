@@ -8,8 +8,59 @@ This module contains utility functions.
 
 """
 
+import re
+import threading
+from functools import wraps
+from multiprocessing.pool import ThreadPool
 from xml.etree import ElementTree
 
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+try:
+    from functools import lru_cache
+except ImportError:
+    lru_cache = None
+
+from .exceptions import IncorrectCellLabel
+
+
+try:
+    unicode
+except NameError:
+    basestring = unicode = str
+
+
+def _memoize(maxsize):
+    """Returns functools.lru_cache(maxsize), or a decorator keeping up to
+    `maxsize` results in a dict on Pythons without it.
+
+    """
+    if lru_cache is not None:
+        return lru_cache(maxsize=maxsize)
+
+    def decorator(func):
+        memo = {}
+
+        @wraps(func)
+        def wrapper(*args):
+            try:
+                return memo[args]
+            except KeyError:
+                pass
+
+            result = func(*args)
+            if len(memo) >= maxsize:
+                memo.clear()
+            memo[args] = result
+            return result
+
+        return wrapper
+
+    return decorator
+
 
 def finditem(func, seq):
     """Finds and returns first item in iterable for which func(item) is True.
@@ -18,6 +69,87 @@ def finditem(func, seq):
     return next((item for item in seq if func(item)))
 
 
+def parallel_map(func, seq, workers=1):
+    """Applies func to every item of seq using a pool of up to `workers`
+    threads and returns a list of results in the order of seq.
+
+    The first exception raised by func is re-raised.
+
+    """
+    seq = list(seq)
+    if workers <= 1 or len(seq) <= 1:
+        return [func(item) for item in seq]
+
+    pool = ThreadPool(min(workers, len(seq)))
+    try:
+        return pool.map(func, seq)
+    finally:
+        pool.close()
+        pool.join()
+
+
+_END = object()
+
+
+def prefetch(iterable, size=1):
+    """Iterates over iterable in a background thread, keeping up to `size`
+    items ready ahead of the consumer, and returns an iterator over them.
+
+    The thread is started by the first ``next()`` call. An exception
+    raised by iterable is re-raised to the consumer. The thread stops once
+    the returned iterator is closed or garbage collected.
+
+    """
+    items = queue.Queue(size)
+    stopped = threading.Event()
+
+    def put(item):
+        while not stopped.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        items_iter = iter(iterable)
+        try:
+            for item in items_iter:
+                if not put((item, None)):
+                    return
+        except Exception as ex:
+            put((_END, ex))
+        else:
+            put((_END, None))
+        finally:
+            # lets a generator release its resources if the consumer
+            # stopped early
+            close = getattr(items_iter, 'close', None)
+            if close is not None:
+                close()
+
+    def consume():
+        # starting the thread here ties its shutdown to the finally
+        # below, which never runs for an iterator that isn't advanced
+        thread = threading.Thread(target=produce)
+        thread.daemon = True
+        thread.start()
+
+        try:
+            while True:
+                item, error = items.get()
+                if item is _END:
+                    if error is not None:
+                        raise error
+                    return
+                yield item
+        finally:
+            stopped.set()
+
+    return consume()
+
+
 # http://stackoverflow.com/questions/749796/pretty-printing-xml-in-python
 # http://effbot.org/zone/element-lib.htm#prettyprint
 def _indent(elem, level=0):
@@ -46,6 +178,164 @@ def _ds(elem):
     return ElementTree.tostring(elem)
 
 
+_MAGIC_NUMBER = 64
+_cell_addr_re = re.compile(r'([A-Za-z]+)(\d+)')
+
+# columns up to ZZZ, the last one with a three letter label
+_MAX_TABLE_COLUMN = 18278
+
+_column_labels = None
+_column_numbers = None
+
+
+def _label_table():
+    """Returns the list of column labels indexed by column number, built
+    on first use.
+
+    """
+    global _column_labels
+
+    if _column_labels is None:
+        letters = [chr(_MAGIC_NUMBER + i) for i in range(1, 27)]
+        two = [a + b for a in letters for b in letters]
+        three = [a + b for a in letters for b in two]
+        _column_labels = [''] + letters + two + three
+
+    return _column_labels
+
+
+def _number_table():
+    """Returns a dict of column numbers by column label, built on first
+    use.
+
+    """
+    global _column_numbers
+
+    if _column_numbers is None:
+        _column_numbers = dict((label, col) for col, label
+                               in enumerate(_label_table()) if col)
+
+    return _column_numbers
+
+
+def _column_label(col):
+    if col <= _MAX_TABLE_COLUMN:
+        return _label_table()[col]
+
+    div = col
+    column_label = ''
+
+    while div:
+        (div, mod) = divmod(div, 26)
+        if mod == 0:
+            mod = 26
+            div -= 1
+        column_label = chr(mod + _MAGIC_NUMBER) + column_label
+
+    return column_label
+
+
+def rowcol_to_a1(row, col):
+    """Translates a row and column cell address to A1 notation.
+
+    :param row: The row of the cell to be converted.
+                Rows start at index 1.
+
+    :param col: The column of the cell to be converted.
+                Columns start at index 1.
+
+    :returns: a string containing the cell's coordinates in A1 notation.
+
+    Columns up to ZZZ are looked up in a table built on first use.
+
+    Example:
+
+    >>> rowcol_to_a1(1, 1)
+    'A1'
+
+    """
+    row = int(row)
+    col = int(col)
+
+    if row < 1 or col < 1:
+        raise IncorrectCellLabel('(%s, %s)' % (row, col))
+
+    return '%s%s' % (_column_label(col), row)
+
+
+def _a1_to_rowcol(label):
+    m = _cell_addr_re.match(label)
+    if m is None:
+        raise IncorrectCellLabel(label)
+
+    column_label = m.group(1).upper()
+    col = _number_table().get(column_label)
+
+    if col is None:
+        col = 0
+        for i, c in enumerate(reversed(column_label)):
+            col += (ord(c) - _MAGIC_NUMBER) * (26 ** i)
+
+    return (int(m.group(2)), col)
+
+
+@_memoize(maxsize=4096)
+def a1_to_rowcol(label):
+    """Translates a cell's address in A1 notation to a tuple of integers.
+
+    :param label: String with cell label in A1 notation, e.g. 'B1'.
+                  Letter case is ignored.
+
+    :returns: a tuple containing `row` and `column` numbers. Both indexed
+              from 1 (one).
+
+    Results for recently used labels are memoized.
+
+    Example:
+
+    >>> a1_to_rowcol('A1')
+    (1, 1)
+
+    """
+    return _a1_to_rowcol(label)
+
+
+def rowcol_to_a1_all(positions):
+    """Translates a sequence of (row, col) tuples to a list of labels in
+    A1 notation, as :func:`rowcol_to_a1` does.
+
+    >>> rowcol_to_a1_all([(1, 1), (2, 28)])
+    ['A1', 'AB2']
+
+    """
+    labels = _label_table()
+    result = []
+    append = result.append
+
+    for row, col in positions:
+        if (type(row) is int and type(col) is int and row > 0 and
+                0 < col <= _MAX_TABLE_COLUMN):
+            append('%s%d' % (labels[col], row))
+        else:
+            append(rowcol_to_a1(row, col))
+
+    return result
+
+
+def a1_to_rowcol_all(labels):
+    """Translates a sequence of labels in A1 notation to a list of
+    (row, col) tuples, as :func:`a1_to_rowcol` does.
+
+    Results aren't memoized, so converting many distinct labels doesn't
+    evict the labels memoized by :func:`a1_to_rowcol`.
+
+    >>> a1_to_rowcol_all(['A1', 'AB2'])
+    [(1, 1), (2, 28)]
+
+    """
+    return [_a1_to_rowcol(label) for label in labels]
+
+
 def numericise(value, empty2zero=False):
     """Returns a value that depends on the input string:
         - Float if input can be converted to Float
@@ -71,6 +361,12 @@ def numericise(value, empty2zero=False):
     >>>
     """
     if value is not None:
+        if isinstance(value, basestring) and not _could_be_number(value):
+            # spares the exceptions int() and float() would raise
+            if value == "" and empty2zero:
+                value = 0
+            return value
+
         try:
             value = int(value)
         except ValueError:
@@ -88,6 +384,126 @@ def numericise_all(input, empty2zero=False):
     return [numericise(s, empty2zero) for s in input]
 
 
+def _could_be_number(value):
+    """Tells whether int() or float() may accept the string `value`. If
+    False, both certainly reject it.
+
+    """
+    value = value.lstrip()
+    if value[:1] in ('+', '-'):
+        value = value[1:]
+
+    first = value[:1]
+    # floats also start with '.', and 'nan', 'inf' or 'infinity'
+    return first.isdigit() or (first != '' and first in '.nNiI')
+
+
+def _numericise_int(value, empty2zero):
+    try:
+        return int(value)
+    except ValueError:
+        return numericise(value, empty2zero)
+
+
+def _numericise_float(value, empty2zero):
+    # int() rejects all of these, so float() is tried first
+    if '.' in value or 'e' in value or 'E' in value:
+        try:
+            return float(value)
+        except ValueError:
+            return value
+
+    return numericise(value, empty2zero)
+
+
+_int_re = re.compile(r'\s*[+-]?\d+\s*$')
+
+# number of rows column types are inferred from
+_SAMPLE_SIZE = 100
+
+
+def _infer_converter(values):
+    """Returns a converter suited to a column with the sample `values`.
+
+    Converters only change the order int() and float() are tried in, so
+    their results are the same as those of :func:`numericise`.
+
+    """
+    kinds = set()
+    for value in values:
+        if not value:
+            continue
+        elif not _could_be_number(value):
+            kinds.add('text')
+        elif _int_re.match(value):
+            kinds.add('int')
+        else:
+            kinds.add('float')
+
+    if kinds == set(['int']):
+        return _numericise_int
+    elif 'float' in kinds and 'text' not in kinds:
+        return _numericise_float
+    else:
+        return numericise
+
+
+def _schema_converter(func):
+    def convert(value, empty2zero):
+        if value == '':
+            return 0 if empty2zero else value
+        try:
+            return func(value)
+        except ValueError:
+            # a stray value doesn't abort the whole read
+            return numericise(value, empty2zero)
+
+    return convert
+
+
+def _column_converters(keys, rows, schema):
+    """Returns a converter for every column of `rows`.
+
+    :param schema: None to numericise every value, 'infer' to pick the
+                   converters from a sample of the rows, or a dict of
+                   conversion functions, e.g. int or str, by key. Columns
+                   missing from the dict, and values a function raises
+                   ValueError for, are numericised.
+
+    """
+    if schema is None:
+        return [numericise] * len(keys)
+
+    if schema == 'infer':
+        sample = rows[:_SAMPLE_SIZE]
+        return [_infer_converter([row[col] for row in sample
+                                  if col < len(row) and
+                                  isinstance(row[col], basestring)])
+                for col in range(len(keys))]
+
+    return [_schema_converter(schema[key]) if key in schema else numericise
+            for key in keys]
+
+
+def _numericise_rows(rows, converters, empty2zero=False):
+    """Converts the string values of every row with the converter of their
+    column, as returned by _column_converters. Values that aren't
+    strings, such as numbers read from the server, are kept as they are.
+
+    """
+    width = len(converters)
+    result = []
+
+    for row in rows:
+        values = list(row)
+        for col, value in enumerate(values[:width]):
+            if isinstance(value, basestring):
+                values[col] = converters[col](value, empty2zero)
+        result.append(values)
+
+    return result
+
+
 if __name__ == '__main__':
     import doctest
     doctest.testmod()
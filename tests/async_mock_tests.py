@@ -0,0 +1,349 @@
+"""Tests for gspread.AsyncClient that don't query the Google API.
+
+These need Python 3.6+ and are kept apart from mock_tests so that the
+rest of the suite still runs on older Pythons.
+"""
+import asyncio
+from datetime import datetime
+from xml.etree import ElementTree
+import unittest
+
+import mock
+
+import gspread
+from tests import test_utils
+
+
+def _position(cell):
+    return (cell.row, cell.col)
+
+
+class MockAsyncClientTest(unittest.TestCase):
+    """Test for gspread.AsyncClient with a fake async HTTP session."""
+
+    def setUp(self):
+        from gspread.asyncclient import AsyncClient, AsyncResponse
+        from gspread.exceptions import HTTPError
+
+        updated = datetime.now()
+        key = '0123456789ABCDEF'
+        title = 'This is a spreadsheet title'
+        ss_feed = test_utils.SpreadsheetFeed(
+            updated, 'foobar@developer.gserviceaccount.com')
+        ss_feed.add_entry(key, title, 'First Last', 'real_email@gmail.com',
+                          updated)
+        ws_feed = test_utils.WorksheetFeed(
+            updated, 'First Last', 'real_email@gmail.com', key, title)
+        ws_feed.add_entry('AB64KEY', 'WS Title', 123456789, 'avkey', 10, 10,
+                          updated)
+        cell_feed = test_utils.CellFeed(updated, key, 'AB64KEY', 'WS Title')
+        cell_feed.add_rows([["A1", "B1"], ["", "b2"]])
+
+        self.feeds = {'/spreadsheets/': ss_feed, '/worksheets/': ws_feed,
+                      '/cells/': cell_feed}
+
+        def get(url, **kwargs):
+            if '/spreadsheets/private/full/' in url:
+                # single spreadsheet entries aren't served, so spreadsheets
+                # are looked up in the spreadsheets feed
+                raise HTTPError(404, 'Not found')
+            etag = 'W/"%s"' % id(self.feeds['/cells/'])
+            if (kwargs.get('headers') or {}).get('If-None-Match') == etag:
+                return AsyncResponse(304, {}, b'')
+            for path, feed in self.feeds.items():
+                if path in url:
+                    return AsyncResponse(200, {'ETag': etag},
+                                         str(feed).encode('utf8'))
+
+        def post(url, data, **kwargs):
+            return AsyncResponse(200, {}, ElementTree.tostring(
+                test_utils.batch_response(data)))
+
+        session = mock.Mock()
+        session.get = mock.AsyncMock(side_effect=get)
+        session.post = mock.AsyncMock(side_effect=post)
+        self.gc = AsyncClient(auth={}, http_session=session)
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+
+    def run_async(self, coroutine):
+        return self.loop.run_until_complete(coroutine)
+
+    def test_get_all_values(self):
+        async def read():
+            sh = await self.gc.open('This is a spreadsheet title')
+            sheet = await sh.sheet1
+            return await asyncio.gather(sheet.get_all_values(),
+                                        sheet.get_all_values())
+
+        self.assertEqual(self.run_async(read()),
+                         [[["A1", "B1"], ["", "b2"]]] * 2)
+
+    def test_update_cells(self):
+        async def update():
+            sh = await self.gc.open_by_key('0123456789ABCDEF')
+            sheet = await sh.worksheet('WS Title')
+            cells = await sheet.range('A1:B2')
+            for cell in cells:
+                cell.value = 'x'
+            return cells, await sheet.update_cells(cells, batch_size=2,
+                                                   workers=2)
+
+        cells, result = self.run_async(update())
+        self.assertTrue(result)
+        self.assertEqual(sorted(map(_position, result.succeeded)),
+                         sorted(map(_position, cells)))
+        self.assertEqual(self.gc.session.post.call_count, 2)
+
+    def test_get_all_values_all_sheets(self):
+        async def read():
+            sh = await self.gc.open_by_key('0123456789ABCDEF')
+            return await sh.get_all_values_all_sheets()
+
+        self.assertEqual(self.run_async(read()),
+                         {'WS Title': [["A1", "B1"], ["", "b2"]]})
+
+    def open_sheet(self):
+        async def open_sheet():
+            sh = await self.gc.open_by_key('0123456789ABCDEF')
+            return await sh.sheet1
+
+        return self.run_async(open_sheet())
+
+    def mock_sheet_entry(self, sheet):
+        """Serves the entry of `sheet` at its self link, which is read when
+        resizing it or revalidating its cells cache.
+
+        """
+        get_feed = self.gc.get_feed
+        self_uri = sheet._get_link('self', sheet._element).get('href')
+
+        async def get(url):
+            if url == self_uri:
+                return ElementTree.fromstring(
+                    ElementTree.tostring(sheet._element))
+            return await get_feed(url)
+
+        patcher = mock.patch.object(self.gc, 'get_feed', side_effect=get)
+        self.addCleanup(patcher.stop)
+        return patcher.start()
+
+    def test_insert_row(self):
+        updated = datetime.now()
+        feed = test_utils.CellFeed(updated, '0123456789ABCDEF', 'AB64KEY',
+                                   'WS Title')
+        feed.add_entry(2, 1, 'a')
+        for row in range(3, 12):
+            feed.add_entry(row, 1, '')
+        self.feeds['/cells/'] = feed
+
+        sheet = self.open_sheet()
+        self.mock_sheet_entry(sheet)
+
+        async def put_feed(url, data):
+            return ElementTree.fromstring(data)
+
+        with mock.patch.object(self.gc, 'put_feed', side_effect=put_feed):
+            result = self.run_async(sheet.insert_row(['x'], index=2))
+
+        self.assertEqual(sheet.row_count, 11)
+        self.assertEqual(
+            [(c.row, c.col, c.value) for c in result.succeeded],
+            [(2, 1, 'x'), (3, 1, 'a')])
+
+    def test_iter_values(self):
+        sheet = self.open_sheet()
+
+        async def read():
+            return [row async for row in sheet.iter_values()]
+
+        self.assertEqual(self.run_async(read()), [["A1", "B1"], ["", "b2"]])
+
+    def test_iter_rows(self):
+        sheet = self.open_sheet()
+
+        async def read():
+            return [row async for row in sheet.iter_rows(
+                batch_rows=1, records=True, read_ahead=2)]
+
+        # every window is answered with the whole feed in this test, so
+        # only the first row of each is checked
+        records = self.run_async(read())
+        self.assertEqual(records[0], {"A1": "", "B1": "b2"})
+        urls = [call[0][0] for call in self.gc.session.get.call_args_list]
+        self.assertTrue(any('min-row=10' in url for url in urls))
+
+    def test_get_all_records_array(self):
+        sheet = self.open_sheet()
+
+        records = self.run_async(sheet.get_all_records_array())
+        self.assertEqual(records, {"A1": [""], "B1": ["b2"]})
+
+    def test_get_all_records_numeric_value_schema(self):
+        feed = test_utils.CellFeed(datetime.now(), '0123456789ABCDEF',
+                                   'AB64KEY', 'WS Title')
+        feed.add_rows([["code", "share", "count"], [7, 0.5, "3"]])
+        self.feeds['/cells/'] = feed
+        sheet = self.open_sheet()
+
+        self.assertEqual(
+            self.run_async(sheet.get_all_records(
+                schema={"code": str, "count": int}, use_numeric_value=True)),
+            [{"code": "7", "share": 0.5, "count": 3}])
+
+    def test_batch_get_workers(self):
+        sheet = self.open_sheet()
+        running = []
+        get = self.gc.session.get.side_effect
+
+        async def slow_get(url, **kwargs):
+            running.append(url)
+            self.assertTrue(len(running) <= 2)
+            await asyncio.sleep(0.01)
+            running.remove(url)
+            return get(url, **kwargs)
+
+        self.gc.session.get.side_effect = slow_get
+        self.gc.session.get.reset_mock()
+        ranges = self.run_async(sheet.batch_get(['A1', 'B1', 'A2', 'B2'],
+                                                workers=2))
+
+        self.assertEqual(len(ranges), 4)
+        self.assertEqual(self.gc.session.get.call_count, 4)
+
+    def test_cache_and_index(self):
+        sheet = self.open_sheet()
+        self.mock_sheet_entry(sheet)
+        sheet.enable_cache()
+
+        async def read():
+            index = await sheet.build_index()
+            cell = await sheet.find("b2")
+            cell.value = "changed"
+            return index, await sheet.findall("b2"), await sheet.row_values(1)
+
+        index, found, row = self.run_async(read())
+        self.assertEqual(_position(index.find("b2")), (2, 2))
+        self.assertEqual([_position(cell) for cell in found], [(2, 2)])
+        self.assertEqual(row[:2], ["A1", "B1"])
+
+        # the cells are downloaded once and then revalidated by ETag
+        cells_reads = [call for call in self.gc.session.get.call_args_list
+                       if '/cells/' in call[0][0]]
+        self.assertEqual(len(cells_reads), 4)
+        for call in cells_reads[1:]:
+            self.assertTrue('If-None-Match' in call[1]['headers'])
+
+    def test_openall_and_iter_spreadsheets(self):
+        async def read():
+            titles = [sh.title for sh in await self.gc.openall()]
+            async for sh in self.gc.iter_spreadsheets():
+                titles.append(sh.title)
+            return titles
+
+        self.assertEqual(self.run_async(read()),
+                         ['This is a spreadsheet title'] * 2)
+
+
+class AsyncHTTPSessionTest(unittest.TestCase):
+    """Test for gspread.asyncclient.AsyncHTTPSession against a local
+    aiohttp server.
+    """
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+        self.requests = 0
+
+    def run_async(self, coroutine):
+        return self.loop.run_until_complete(coroutine)
+
+    def serve(self, handler):
+        from aiohttp import web
+        from aiohttp.test_utils import TestServer
+
+        async def count(request):
+            self.requests += 1
+            return await handler(request)
+
+        app = web.Application()
+        app.router.add_route('*', '/', count)
+        server = TestServer(app)
+        self.run_async(server.start_server())
+        self.addCleanup(self.run_async, server.close())
+        return str(server.make_url('/'))
+
+    def session(self, **kwargs):
+        from gspread.asyncclient import AsyncHTTPSession
+
+        policy = gspread.httpsession.RetryPolicy(max_attempts=3,
+                                                 backoff_factor=0,
+                                                 jitter=False)
+        session = AsyncHTTPSession(retry_policy=policy, **kwargs)
+        self.addCleanup(self.run_async, session.close())
+        return session
+
+    def test_retry_and_stream(self):
+        from aiohttp import web
+
+        body = b'x' * 200000
+
+        async def handler(request):
+            if self.requests == 1:
+                return web.Response(status=503)
+            return web.Response(body=body)
+
+        url = self.serve(handler)
+        limiter = gspread.httpsession.RateLimiter(per_second=1000)
+        session = self.session(rate_limiter=limiter)
+
+        async def read():
+            response = await session.get(url, stream=True)
+            try:
+                return b''.join([chunk async for chunk in
+                                 response.iter_chunks(size=4096)])
+            finally:
+                response.close()
+
+        self.assertEqual(self.run_async(read()), body)
+        self.assertEqual(self.requests, 2)
+        self.assertEqual(limiter.requests, 2)
+
+    def test_read_timeout(self):
+        from aiohttp import web
+
+        async def handler(request):
+            if self.requests == 1:
+                await asyncio.sleep(1)
+            return web.Response(body=b'ok')
+
+        url = self.serve(handler)
+        session = self.session(read_timeout=0.1)
+
+        response = self.run_async(session.get(url))
+        self.assertEqual(response.content, b'ok')
+        self.assertEqual(self.requests, 2)
+
+        # a POST the server may have received isn't repeated
+        self.requests = 0
+        self.assertRaises(asyncio.TimeoutError, self.run_async,
+                          session.post(url, 'data'))
+        self.assertEqual(self.requests, 1)
+
+    def test_connect_timeout_retries_post(self):
+        import aiohttp
+
+        response = mock.Mock(status=200, headers={})
+        response.read = mock.AsyncMock(return_value=b'ok')
+        client_session = mock.Mock()
+        client_session.request = mock.AsyncMock(
+            side_effect=[aiohttp.ConnectionTimeoutError(), response])
+
+        session = self.session()
+        with mock.patch.object(session, '_client_session',
+                               return_value=client_session):
+            result = self.run_async(session.post('https://example.com',
+                                                 'data'))
+
+        self.assertEqual(result.content, b'ok')
+        self.assertEqual(client_session.request.call_count, 2)
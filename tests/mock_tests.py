@@ -4,7 +4,12 @@ Avoiding direct network access is benefitial in that it markedly speeds up
 testing, avoids error-prone credential setup, and enables validation even if
 internet access is unavailable.
 """
+from array import array
 from datetime import datetime
+from xml.etree import ElementTree
+import io
+import math
+import threading
 import unittest
 try:
     import ConfigParser
@@ -13,11 +18,220 @@ except ImportError:
 
 import mock
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 import gspread
 from tests import test
 from tests import test_utils
 
 
+class MockHTTPSessionTest(unittest.TestCase):
+    """Test for gspread.httpsession.HTTPSession that mocks out requests."""
+
+    def test_pool_and_timeouts(self):
+        session = gspread.httpsession.HTTPSession(
+            pool_maxsize=32, connect_timeout=3, read_timeout=30,
+            keep_alive=False)
+        adapter = session.requests_session.get_adapter('https://example.com')
+        self.assertEqual(adapter._pool_maxsize, 32)
+
+        with mock.patch.object(session.requests_session, 'get',
+                               return_value=mock.Mock(status_code=200)) as get:
+            session.get('https://example.com')
+
+        self.assertEqual(get.call_args[1]['timeout'], (3, 30))
+        self.assertEqual(get.call_args[1]['headers']['Connection'], 'close')
+
+    def retrying_session(self, method, *responses):
+        policy = gspread.httpsession.RetryPolicy(max_attempts=3, jitter=False)
+        session = gspread.httpsession.HTTPSession(retry_policy=policy)
+        patcher = mock.patch.object(session.requests_session, method,
+                                    side_effect=responses)
+        self.addCleanup(patcher.stop)
+        return session, patcher.start()
+
+    @mock.patch('gspread.httpsession.time.sleep')
+    def test_retry(self, sleep):
+        session, get = self.retrying_session(
+            'get',
+            mock.Mock(status_code=503, headers={}),
+            mock.Mock(status_code=429, headers={'Retry-After': '7'}),
+            mock.Mock(status_code=200))
+
+        self.assertEqual(session.get('https://example.com').status_code, 200)
+        self.assertEqual(get.call_count, 3)
+        self.assertEqual([c[0][0] for c in sleep.call_args_list], [0.5, 7])
+
+    @mock.patch('gspread.httpsession.time.sleep')
+    def test_retry_gives_up(self, sleep):
+        session, get = self.retrying_session(
+            'get', *[mock.Mock(status_code=500, headers={}, content='')] * 3)
+
+        self.assertRaises(gspread.RequestError, session.get,
+                          'https://example.com')
+        self.assertEqual(get.call_count, 3)
+
+    @mock.patch('gspread.httpsession.time.sleep')
+    def test_retry_non_idempotent(self, sleep):
+        session, post = self.retrying_session(
+            'post',
+            mock.Mock(status_code=429, headers={}),
+            mock.Mock(status_code=503, headers={}, content=''))
+
+        self.assertRaises(gspread.RequestError, session.post,
+                          'https://example.com', 'data')
+        self.assertEqual(post.call_count, 2)
+
+
+class MockRateLimiterTest(unittest.TestCase):
+    """Test for gspread.httpsession.RateLimiter with a fake clock."""
+
+    def setUp(self):
+        self.now = 0.0
+        clock = mock.patch('gspread.httpsession._clock',
+                           side_effect=lambda: self.now)
+        sleep = mock.patch('gspread.httpsession.time.sleep')
+        for patcher in (clock, sleep):
+            self.addCleanup(patcher.stop)
+        clock.start()
+        self.sleep = sleep.start()
+
+    def test_per_second(self):
+        limiter = gspread.httpsession.RateLimiter(per_second=2)
+        waits = [limiter.acquire() for i in range(4)]
+
+        self.assertEqual(waits, [0, 0, 0.5, 1.0])
+        self.assertEqual(limiter.requests, 4)
+        self.assertEqual(limiter.wait_time, 1.5)
+
+        self.now = 10.0
+        self.assertEqual(limiter.acquire(), 0)
+
+    def test_per_100_seconds(self):
+        limiter = gspread.httpsession.RateLimiter(per_second=10,
+                                                  per_100_seconds=3)
+        waits = [limiter.acquire() for i in range(4)]
+        self.assertEqual(waits, [0, 0, 0, 100 / 3.0])
+
+    def test_shared_between_sessions(self):
+        limiter = gspread.httpsession.RateLimiter(per_second=1)
+        c1 = gspread.Client(auth={}, rate_limiter=limiter)
+        c2 = gspread.Client(auth={}, rate_limiter=limiter)
+
+        for client in (c1, c2):
+            with mock.patch.object(client.session.requests_session, 'get',
+                                   return_value=mock.Mock(status_code=200)):
+                client.session.get('https://example.com')
+
+        self.assertEqual(limiter.requests, 2)
+        self.sleep.assert_called_once_with(1.0)
+
+
+class UtilsTest(unittest.TestCase):
+    """Test for the helpers in gspread.utils."""
+
+    def test_rowcol_to_a1(self):
+        utils = gspread.utils
+        for (row, col), label in [((1, 1), 'A1'), ((7, 26), 'Z7'),
+                                  ((3, 27), 'AA3'), ((1, 702), 'ZZ1'),
+                                  ((1, 703), 'AAA1'), ((9, 18278), 'ZZZ9'),
+                                  ((2, 18279), 'AAAA2')]:
+            self.assertEqual(utils.rowcol_to_a1(row, col), label)
+            self.assertEqual(utils.a1_to_rowcol(label), (row, col))
+            self.assertEqual(utils.a1_to_rowcol(label.lower()), (row, col))
+
+        self.assertRaises(gspread.IncorrectCellLabel,
+                          utils.rowcol_to_a1, 0, 1)
+        self.assertRaises(gspread.IncorrectCellLabel,
+                          utils.a1_to_rowcol, '1A')
+
+    def test_a1_conversion_all(self):
+        utils = gspread.utils
+        positions = [(1, 1), (10, 28), (5, 18279)]
+        labels = utils.rowcol_to_a1_all(positions)
+
+        self.assertEqual(labels, ['A1', 'AB10', 'AAAA5'])
+        self.assertEqual(utils.a1_to_rowcol_all(labels), positions)
+        self.assertRaises(gspread.IncorrectCellLabel,
+                          utils.rowcol_to_a1_all, [(1, 1), (1, 0)])
+
+    def test_numericise(self):
+        def reference(value, empty2zero):
+            try:
+                return int(value)
+            except ValueError:
+                try:
+                    return float(value)
+                except ValueError:
+                    return 0 if value == '' and empty2zero else value
+
+        values = ['faa', '3', '3.1', '', ' 4 ', '-5', '+.5', '1e5', 'e5',
+                  '.', '-', 'nan', 'Infinity', '-inf', 'info', '1,000',
+                  '007', u'\u0663', '12abc', ' ', '\t1.5\n']
+        for empty2zero in (False, True):
+            for value in values:
+                expected = reference(value, empty2zero)
+                result = gspread.utils.numericise(value, empty2zero)
+                if isinstance(expected, float) and math.isnan(expected):
+                    self.assertTrue(math.isnan(result))
+                else:
+                    self.assertEqual((type(result), result),
+                                     (type(expected), expected))
+
+    def test_prefetch(self):
+        fetched = []
+
+        def produce():
+            for n in range(5):
+                fetched.append(n)
+                yield n
+
+        items = gspread.utils.prefetch(produce(), 2)
+        self.assertEqual(next(items), 0)
+        self.assertEqual(list(items), [1, 2, 3, 4])
+        self.assertEqual(fetched, [0, 1, 2, 3, 4])
+
+    def test_prefetch_error(self):
+        def produce():
+            yield 1
+            raise ValueError('broken')
+
+        items = gspread.utils.prefetch(produce())
+        self.assertEqual(next(items), 1)
+        self.assertRaises(ValueError, next, items)
+
+    def test_prefetch_close(self):
+        closed = threading.Event()
+
+        def produce():
+            try:
+                while True:
+                    yield 1
+            finally:
+                closed.set()
+
+        items = gspread.utils.prefetch(produce(), 1)
+        self.assertEqual(next(items), 1)
+        items.close()
+        self.assertTrue(closed.wait(5))
+
+    def test_prefetch_not_started(self):
+        fetched = []
+
+        def produce():
+            fetched.append(1)
+            yield 1
+
+        threads = threading.active_count()
+        items = gspread.utils.prefetch(produce())
+        self.assertEqual(threading.active_count(), threads)
+        del items
+        self.assertEqual(fetched, [])
+
+
 class MockGspreadTest(unittest.TestCase):
     """This is the base class for all tests not accessing the API.
 
@@ -66,6 +280,105 @@ class MockClientTest(MockGspreadTest, test.ClientTest):
 
         feed = feed_obj.to_xml()
         cls.gc.get_spreadsheets_feed = mock.Mock(return_value=feed)
+        cls.gc.get_feed = mock.Mock(
+            return_value=feed.find('{http://www.w3.org/2005/Atom}entry'))
+
+
+class MockClientCacheTest(unittest.TestCase):
+    """Test for the spreadsheets metadata cache of gspread.Client."""
+
+    def setUp(self):
+        updated = datetime.now()
+        feed = test_utils.SpreadsheetFeed(
+            updated, 'foobar@developer.gserviceaccount.com')
+        for n in range(3):
+            feed.add_entry('KEY%s' % n, 'Title %s' % n, 'First Last',
+                           'real_email@gmail.com', updated)
+        self.feed = feed.to_xml()
+        self.entry = self.feed.find('{http://www.w3.org/2005/Atom}entry')
+
+        self.gc = gspread.Client(auth={})
+        self.gc.get_spreadsheets_feed = mock.Mock(return_value=self.feed)
+        self.gc.get_feed = mock.Mock(return_value=self.entry)
+
+    def test_open_uses_cache(self):
+        self.assertEqual(self.gc.open('Title 1').title, 'Title 1')
+        self.assertEqual(self.gc.open('Title 2').title, 'Title 2')
+        self.assertEqual(self.gc.open_by_key('KEY0').id, 'KEY0')
+        self.assertEqual(len(self.gc.openall()), 3)
+
+        self.assertEqual(self.gc.get_spreadsheets_feed.call_count, 1)
+        self.assertFalse(self.gc.get_feed.called)
+
+    def test_open_refreshes_on_miss(self):
+        self.gc.open('Title 0')
+        self.assertRaises(gspread.SpreadsheetNotFound,
+                          self.gc.open, 'No such title')
+        self.assertEqual(self.gc.get_spreadsheets_feed.call_count, 2)
+
+    def test_cache_expires(self):
+        with mock.patch('gspread.client._clock', return_value=0):
+            self.gc.open('Title 0')
+        with mock.patch('gspread.client._clock', return_value=61):
+            self.gc.open('Title 0')
+        self.assertEqual(self.gc.get_spreadsheets_feed.call_count, 2)
+
+        self.gc.refresh()
+        self.assertEqual(self.gc.get_spreadsheets_feed.call_count, 3)
+
+    def spreadsheets_page(self, first, count, next_url=None):
+        feed = test_utils.SpreadsheetFeed(
+            datetime.now(), 'foobar@developer.gserviceaccount.com')
+        for n in range(first, first + count):
+            feed.add_entry('KEY%s' % n, 'Title %s' % n, 'First Last',
+                           'real_email@gmail.com', datetime.now())
+        feed = feed.to_xml()
+        if next_url:
+            ElementTree.SubElement(feed, '{http://www.w3.org/2005/Atom}link',
+                                   {'rel': 'next', 'href': next_url})
+        return feed
+
+    def test_iter_spreadsheets(self):
+        pages = [self.spreadsheets_page(0, 2, 'https://next/page'),
+                 self.spreadsheets_page(2, 2),
+                 self.spreadsheets_page(4, 1)]
+        self.gc.get_feed = mock.Mock(side_effect=pages)
+
+        spreadsheets = self.gc.iter_spreadsheets(page_size=2)
+        self.assertEqual(next(spreadsheets).id, 'KEY0')
+        self.assertEqual(self.gc.get_feed.call_count, 1)
+        self.assertIn('max-results=2', self.gc.get_feed.call_args[0][0])
+
+        self.assertEqual([sh.id for sh in spreadsheets],
+                         ['KEY1', 'KEY2', 'KEY3', 'KEY4'])
+        urls = [c[0][0] for c in self.gc.get_feed.call_args_list]
+        self.assertEqual(urls[1], 'https://next/page')
+        self.assertIn('start-index=5', urls[2])
+        self.assertFalse(self.gc.get_spreadsheets_feed.called)
+
+    def test_iter_spreadsheets_title(self):
+        self.gc.get_feed = mock.Mock(
+            return_value=self.spreadsheets_page(0, 2))
+
+        self.assertEqual([sh.title for sh in
+                          self.gc.iter_spreadsheets(title='Title 1')],
+                         ['Title 1'])
+        self.assertIn('title-exact=true', self.gc.get_feed.call_args[0][0])
+
+    def test_open_by_key_fetches_entry(self):
+        self.assertEqual(self.gc.open_by_key('KEY0').id, 'KEY0')
+
+        self.assertFalse(self.gc.get_spreadsheets_feed.called)
+        self.gc.get_feed.assert_called_once_with(
+            'https://spreadsheets.google.com/feeds/spreadsheets/private/full/KEY0')
+
+    def test_open_by_key_falls_back_to_feed(self):
+        self.gc.get_feed.side_effect = gspread.exceptions.HTTPError(
+            404, 'Not Found')
+
+        self.assertEqual(self.gc.open_by_key('KEY1').id, 'KEY1')
+        self.assertRaises(gspread.SpreadsheetNotFound,
+                          self.gc.open_by_key, 'NOKEY')
 
 
 class MockSpreadsheetTest(MockGspreadTest, test.SpreadsheetTest):
@@ -110,3 +423,648 @@ class MockSpreadsheetTest(MockGspreadTest, test.SpreadsheetTest):
         # Set up mocks
         cls.gc.get_spreadsheets_feed = mock.Mock(return_value=ss_feed.to_xml())
         cls.gc.get_worksheets_feed = mock.Mock(return_value=ws_feed.to_xml())
+
+
+def _position(cell):
+    return (cell.row, cell.col)
+
+
+def stream_response(feed, etag=None):
+    """Returns a mock response streaming the XML of `feed`."""
+    content = str(feed).encode('utf8')
+    headers = {'ETag': etag} if etag else {}
+    return mock.Mock(raw=io.BytesIO(content), content=content,
+                     status_code=200, headers=headers)
+
+
+class MockWorksheetTest(MockGspreadTest):
+    """Test for gspread.Worksheet that mocks out the server response."""
+
+    @classmethod
+    def setUpClass(cls):
+        super(MockWorksheetTest, cls).setUpClass()
+
+        updated = datetime.now()
+        user_name = 'First Last'
+        user_email = 'real_email@gmail.com'
+        key = '0123456789ABCDEF'
+        title = 'This is a spreadsheet title'
+        dev_email = 'foobar@developer.gserviceaccount.com'
+        ss_feed = test_utils.SpreadsheetFeed(updated, dev_email)
+        ss_feed.add_entry(key, title, user_name, user_email, updated)
+
+        ws_key = 'AB64KEY'
+        ws_title = 'WS Title'
+        ws_feed = test_utils.WorksheetFeed(updated, user_name, user_email,
+                                           key, title)
+        ws_feed.add_entry(ws_key, ws_title, 123456789, 'avkey', 10, 10,
+                          updated)
+
+        cls.gc.get_spreadsheets_feed = mock.Mock(return_value=ss_feed.to_xml())
+        cls.gc.get_worksheets_feed = mock.Mock(return_value=ws_feed.to_xml())
+        cls.cell_feed_args = (updated, key, ws_key, ws_title)
+
+    def setUp(self):
+        self.sheet = self.gc.open('This is a spreadsheet title').sheet1
+
+    def cell_feed(self):
+        return test_utils.CellFeed(*self.cell_feed_args)
+
+    def mock_stream(self, feed):
+        patcher = mock.patch.object(self.gc.session, 'get',
+                                    return_value=stream_response(feed))
+        self.addCleanup(patcher.stop)
+        return patcher.start()
+
+    def mock_cells(self, rows):
+        feed = self.cell_feed()
+        feed.add_rows(rows)
+        return self.mock_stream(feed)
+
+    def test_metadata_snapshot(self):
+        element = ElementTree.fromstring(
+            ElementTree.tostring(self.sheet._element))
+        row_count = element.find(
+            '{http://schemas.google.com/spreadsheets/2006}rowCount')
+        row_count.text = '99'
+        self.assertEqual(self.sheet.row_count, 10)
+
+        self.sheet._element = element
+        self.assertEqual(self.sheet.row_count, 99)
+        row_count.text = '5'
+        self.assertEqual(self.sheet.row_count, 99)
+
+        self.assertEqual(self.sheet.get_id_fields(),
+                         {'spreadsheet_id': '0123456789ABCDEF',
+                          'worksheet_id': 'AB64KEY'})
+        self.assertEqual(self.sheet.version, 'avkey')
+
+    def test_get_all_values(self):
+        rows = [["A1", "B1", "", "D1"],
+                ["", "b2", "", ""],
+                ["", "", "", ""],
+                ["A4", "B4", "", "D4"]]
+        get = self.mock_cells(rows)
+
+        self.assertEqual(self.sheet.get_all_values(), rows)
+        self.assertTrue(get.call_args[1]['stream'])
+
+    def mock_windows(self, rows):
+        """Serves the cells of `rows` that are within the requested rows."""
+        def get(url, **kwargs):
+            params = dict(p.split('=') for p in url.split('?')[1].split('&'))
+            first, last = int(params['min-row']), int(params['max-row'])
+            feed = self.cell_feed()
+            for row, values in enumerate(rows[first - 1:last], start=first):
+                for col, value in enumerate(values, start=1):
+                    if value != '':
+                        feed.add_entry(row, col, value)
+            return stream_response(feed)
+
+        patcher = mock.patch.object(self.gc.session, 'get', side_effect=get)
+        self.addCleanup(patcher.stop)
+        return patcher.start()
+
+    def mock_query(self, values):
+        respond = lambda worksheet, data: test_utils.batch_query_response(
+            self.cell_feed(), data, values)
+        patcher = mock.patch.object(self.gc, 'post_cells', side_effect=respond)
+        self.addCleanup(patcher.stop)
+        return patcher.start()
+
+    def mock_batch(self, failed=()):
+        """Patches post_cells to answer batch updates. `failed` holds the
+        ids of the cells failing in each request, e.g. [['R1C2']]; later
+        requests succeed.
+
+        """
+        failed = iter(failed)
+        respond = lambda worksheet, data: test_utils.batch_response(
+            data, failed=next(failed, ()))
+        patcher = mock.patch.object(self.gc, 'post_cells', side_effect=respond)
+        self.addCleanup(patcher.stop)
+        return patcher.start()
+
+    def test_cells(self):
+        post_cells = self.mock_query({(1, 1): 'a1', (99, 26): 'z99'})
+
+        cells = self.sheet.acells(['Z99', 'A1', 'z99'])
+        self.assertEqual([(c.row, c.col, c.value) for c in cells],
+                         [(99, 26, 'z99'), (1, 1, 'a1'), (99, 26, 'z99')])
+        self.assertEqual(cells[0].version, '1ijmb0')
+        self.assertEqual(post_cells.call_count, 1)
+
+        request = ElementTree.fromstring(post_cells.call_args[0][1])
+        operations = request.findall(
+            '{http://www.w3.org/2005/Atom}entry/'
+            '{http://schemas.google.com/gdata/batch}operation')
+        self.assertEqual([op.get('type') for op in operations],
+                         ['query', 'query'])
+
+    def test_cells_failure(self):
+        self.mock_query({(1, 1): 'a1'})
+        self.assertRaises(gspread.RequestError,
+                          self.sheet.cells, [(1, 1), (2000, 1)])
+
+    def test_batch_get(self):
+        def get(url, **kwargs):
+            feed = self.cell_feed()
+            if 'range=A1%3AB1' in url:
+                feed.add_entry(1, 1, 'a1')
+                feed.add_entry(1, 2, 'b1')
+            else:
+                feed.add_entry(5, 3, 'c5')
+            return stream_response(feed)
+
+        with mock.patch.object(self.gc.session, 'get',
+                               side_effect=get) as session_get:
+            result = self.sheet.batch_get(['A1:B1', 'C5'], workers=2)
+
+        self.assertEqual([[cell.value for cell in cells] for cells in result],
+                         [['a1', 'b1'], ['c5']])
+        self.assertEqual(session_get.call_count, 2)
+
+    def test_iter_rows(self):
+        rows = [["a1", "b1"], [], [], [], ["a5"], ["", "", "c6"], [], []]
+        get = self.mock_windows(rows)
+
+        result = self.sheet.iter_rows(batch_rows=3)
+        self.assertEqual(next(result), ["a1", "b1"] + [''] * 8)
+        self.assertEqual(get.call_count, 1)
+
+        self.assertEqual(list(result),
+                         [[''] * 10] * 3 +
+                         [["a5"] + [''] * 9, ["", "", "c6"] + [''] * 7])
+        self.assertEqual(get.call_count, 4)
+
+    def test_iter_rows_read_ahead(self):
+        rows = [["a%s" % n] for n in range(1, 11)]
+        self.mock_windows(rows)
+
+        self.assertEqual(
+            [row[0] for row in self.sheet.iter_rows(batch_rows=3,
+                                                    read_ahead=2)],
+            ["a%s" % n for n in range(1, 11)])
+
+    def test_iter_rows_records(self):
+        rows = [["skipped"], ["name", "price"], ["pen", "1.5"], [],
+                ["ink", ""]]
+        self.mock_windows(rows)
+
+        self.assertEqual(
+            list(self.sheet.iter_rows(batch_rows=2, records=True, head=2,
+                                      empty2zero=True)),
+            [{"name": "pen", "price": 1.5}, {"name": 0, "price": 0},
+             {"name": "ink", "price": 0}])
+
+    def test_iter_rows_records_beyond_head(self):
+        self.mock_cells([["name", "price"], ["pen", "1.5", "extra"]])
+        records = list(self.sheet.iter_rows(records=True))
+
+        self.mock_cells([["name", "price"], ["pen", "1.5", "extra"]])
+        self.assertEqual(records, self.sheet.get_all_records())
+        self.assertEqual(records,
+                         [{"name": "pen", "price": 1.5, "": "extra"}])
+
+    def test_get_all_values_empty(self):
+        self.mock_cells([])
+        self.assertEqual(self.sheet.get_all_values(), [])
+
+    def test_iter_values(self):
+        self.mock_cells([["", "b1"], [], ["a3"]])
+        self.assertEqual(list(self.sheet.iter_values()),
+                         [["", "b1"], [], ["a3"]])
+
+    def test_cell_is_compact(self):
+        self.mock_cells([["a1"]])
+        cell = self.sheet.range('A1')[0]
+        self.assertFalse(hasattr(cell, '__dict__'))
+        self.assertFalse(hasattr(cell, 'element'))
+        self.assertEqual((cell.row, cell.col, cell.value), (1, 1, 'a1'))
+        self.assertEqual(cell.version, '1ijmb0')
+
+    def test_update_cells_feed(self):
+        self.mock_cells([["a1", "b1"]])
+        cells = self.sheet.range('A1:B1')
+        cells[1].value = 'new'
+
+        with mock.patch.object(self.gc, 'post_cells') as post_cells:
+            self.sheet.update_cells(cells, changed_only=False)
+
+        feed = ElementTree.fromstring(post_cells.call_args[0][1])
+        entries = feed.findall('{http://www.w3.org/2005/Atom}entry')
+        self.assertEqual(len(entries), 2)
+
+        cell_url = ('https://spreadsheets.google.com/feeds/cells/'
+                    '0123456789ABCDEF/AB64KEY/private/full/R1C2')
+        entry = entries[1]
+        self.assertEqual(entry.find('{http://www.w3.org/2005/Atom}id').text,
+                         cell_url)
+        link = entry.find('{http://www.w3.org/2005/Atom}link')
+        self.assertEqual(link.get('href'), cell_url + '/1ijmb0')
+        cell_elem = entry.find(
+            '{http://schemas.google.com/spreadsheets/2006}cell')
+        self.assertEqual(cell_elem.get('inputValue'), 'new')
+
+    def test_update_cells_feed_v3(self):
+        self.mock_resize()
+        feed = self.cell_feed()
+        feed.add_entry(1, 1, 'a1', version=None)
+        self.mock_stream(feed)
+
+        self.sheet.enable_cache()
+        cell = self.sheet.find('a1')
+        self.assertEqual(cell.version, None)
+        cell.value = 'new'
+
+        with mock.patch.object(self.gc, 'post_cells') as post_cells:
+            self.sheet.update_cells([cell])
+
+        feed = ElementTree.fromstring(post_cells.call_args[0][1])
+        entry = feed.find('{http://www.w3.org/2005/Atom}entry')
+        link = entry.find('{http://www.w3.org/2005/Atom}link')
+        self.assertEqual(link.get('href'),
+                         'https://spreadsheets.google.com/feeds/cells/'
+                         '0123456789ABCDEF/AB64KEY/private/full/R1C1')
+
+    def test_get_all_records_schema(self):
+        rows = [["name", "count", "price", "code"],
+                ["pen", "3", "1.5", "007"],
+                ["ink", "", "2", "x1"],
+                ["", "12", "3.25e1", ""]]
+        self.mock_cells(rows)
+        expected = self.sheet.get_all_records(empty2zero=True)
+        self.assertEqual(expected[0],
+                         {"name": "pen", "count": 3, "price": 1.5,
+                          "code": 7})
+
+        self.mock_cells(rows)
+        self.assertEqual(
+            self.sheet.get_all_records(empty2zero=True, schema='infer'),
+            expected)
+
+        self.mock_cells(rows)
+        records = self.sheet.get_all_records(
+            schema={"price": float, "code": str})
+        self.assertEqual([(r["count"], r["price"], r["code"])
+                          for r in records],
+                         [(3, 1.5, "007"), ("", 2.0, "x1"), (12, 32.5, "")])
+
+    def test_get_all_records_numeric_value(self):
+        feed = self.cell_feed()
+        feed.add_entry(1, 1, "1000")
+        feed.add_entry(1, 2, "share")
+        feed.add_entry(2, 1, "1,000", input_value="1000", numeric_value=1000)
+        feed.add_entry(2, 2, "50%", input_value="0.5", numeric_value=0.5)
+        feed.add_entry(3, 2, "n/a")
+        self.mock_stream(feed)
+
+        self.assertEqual(
+            self.sheet.get_all_records(use_numeric_value=True),
+            [{"1000": 1000, "share": 0.5}, {"1000": "", "share": "n/a"}])
+
+    def test_get_all_records_numeric_value_schema(self):
+        feed = self.cell_feed()
+        feed.add_entry(1, 1, "code")
+        feed.add_entry(1, 2, "share")
+        feed.add_entry(2, 1, "007", input_value="7", numeric_value=7)
+        feed.add_entry(2, 2, "50%", input_value="0.5", numeric_value=0.5)
+        self.mock_stream(feed)
+
+        self.assertEqual(
+            self.sheet.get_all_records(schema={"code": str},
+                                       use_numeric_value=True),
+            [{"code": "007", "share": 0.5}])
+
+    def test_get_all_records_schema_fallback(self):
+        self.mock_cells([["count"], ["3"], ["n/a"], ["2.5"]])
+
+        self.assertEqual(
+            self.sheet.get_all_records(schema={"count": int}),
+            [{"count": 3}, {"count": "n/a"}, {"count": 2.5}])
+
+    def test_get_all_values_array(self):
+        self.mock_cells([["A1", 1, "", ""],
+                         ["", 2.5, "c2", ""],
+                         ["", "", 3, ""],
+                         ["A4", 4, "", "D4"]])
+        columns = self.sheet.get_all_values_array()
+
+        self.assertEqual(sorted(columns), ['A', 'B', 'C', 'D'])
+        self.assertEqual(columns['A'], ['A1', '', '', 'A4'])
+        self.assertEqual(columns['C'], ['', 'c2', '3', ''])
+        self.assertEqual(columns['D'], ['', '', '', 'D4'])
+
+        numbers = columns['B']
+        self.assertTrue(isinstance(numbers, array))
+        self.assertEqual(list(numbers[:2]) + list(numbers[3:]), [1, 2.5, 4])
+        self.assertTrue(math.isnan(numbers[2]))
+
+    def test_get_all_records_array(self):
+        self.mock_cells([["", ""],
+                         ["name", "amount"],
+                         ["foo", 1],
+                         ["", ""],
+                         ["bar", 3]])
+        records = self.sheet.get_all_records_array(empty2zero=True, head=2)
+
+        self.assertEqual(records['name'], ['foo', 0, 'bar'])
+        self.assertEqual(records['amount'], array('d', [1, 0, 3]))
+
+    @unittest.skipIf(numpy is None, 'NumPy is not installed')
+    def test_get_all_values_array_numpy(self):
+        self.mock_cells([["A1", 1], ["", 2.5]])
+        values = self.sheet.get_all_values_array(use_numpy=True)
+
+        self.assertEqual(values.dtype.names, ('A', 'B'))
+        self.assertEqual(list(values['A']), ['A1', ''])
+        self.assertEqual(list(values['B']), [1, 2.5])
+
+    @unittest.skipIf(numpy is None, 'NumPy is not installed')
+    def test_get_all_records_array_numpy_empty_header(self):
+        self.mock_cells([["name", "", "amount"], ["foo", "x", 1]])
+        records = self.sheet.get_all_records_array(use_numpy=True)
+
+        self.assertEqual(records.dtype.names, ('name', 'B', 'amount'))
+        self.assertEqual(list(records['B']), ['x'])
+
+    @unittest.skipIf(numpy is None, 'NumPy is not installed')
+    def test_get_all_records_array_numpy_duplicate_header(self):
+        self.mock_cells([["amount", "amount"], [1, 2]])
+        records = self.sheet.get_all_records_array(use_numpy=True)
+
+        self.assertEqual(records.dtype.names, ('amount', 'B'))
+        self.assertEqual(list(records['amount']), [1])
+        self.assertEqual(list(records['B']), [2])
+
+    def test_update_cells_changed_only(self):
+        self.mock_cells([["a1", "b1", "c1", "d1"]])
+        cells = self.sheet.range('A1:D1')
+        cells[1].value = 'new'
+        cells[2].value = 'c1'
+        cells[3].value = 'd1'
+        cells[3].value = 'x'
+
+        self.assertEqual([cell.modified for cell in cells],
+                         [False, True, False, True])
+
+        post_cells = self.mock_batch()
+        result = self.sheet.update_cells(cells)
+        self.assertEqual(result.skipped, 2)
+        self.assertEqual(result.succeeded, [cells[1], cells[3]])
+        self.assertFalse(cells[1].modified)
+        self.assertEqual(cells[1].input_value, 'new')
+
+        result = self.sheet.update_cells(cells)
+
+        self.assertEqual(post_cells.call_count, 1)
+        self.assertEqual(result.skipped, 4)
+
+    def test_update_cells_duplicate_position(self):
+        self.mock_cells([["a1"]])
+        cells = self.sheet.range('A1')
+        self.mock_cells([["a1"]])
+        cells += self.sheet.range('A1')
+        cells[0].value = 'x'
+        cells[1].value = 'y'
+
+        post_cells = self.mock_batch()
+        self.assertRaises(ValueError, self.sheet.update_cells, cells)
+        self.assertFalse(post_cells.called)
+
+    def test_update_cells_in_batches(self):
+        self.mock_cells([["a1", "b1", "c1", "d1", "e1"]])
+        cells = self.sheet.range('A1:E1')
+
+        post_cells = self.mock_batch()
+        result = self.sheet.update_cells(cells, batch_size=2, workers=2,
+                                         changed_only=False)
+
+        self.assertEqual(post_cells.call_count, 3)
+        self.assertEqual(result.succeeded, cells)
+        self.assertEqual(result.failed, [])
+
+    def test_update_cells_failures(self):
+        self.mock_cells([["a1", "b1", "c1"]])
+        cells = self.sheet.range('A1:C1')
+
+        self.mock_batch(failed=[['R1C2']])
+        result = self.sheet.update_cells(cells, changed_only=False)
+
+        self.assertFalse(result)
+        self.assertEqual(result.succeeded, [cells[0], cells[2]])
+        self.assertEqual(result.failed, [(cells[1], 403, 'Forbidden')])
+
+    def test_update_cells_retries_failed(self):
+        self.mock_cells([["a1", "b1", "c1"]])
+        cells = self.sheet.range('A1:C1')
+
+        post_cells = self.mock_batch(failed=[['R1C2', 'R1C3'], ['R1C3']])
+        result = self.sheet.update_cells(cells, retries=2, changed_only=False)
+
+        self.assertTrue(result)
+        self.assertEqual(post_cells.call_count, 3)
+        self.assertEqual(result.succeeded, cells)
+        retried = ElementTree.fromstring(post_cells.call_args[0][1])
+        self.assertEqual(
+            len(retried.findall('{http://www.w3.org/2005/Atom}entry')), 1)
+
+    def mock_resize(self):
+        get_feed = mock.patch.object(
+            self.gc, 'get_feed',
+            side_effect=lambda url: ElementTree.fromstring(
+                ElementTree.tostring(self.sheet._element)))
+        put_feed = mock.patch.object(
+            self.gc, 'put_feed',
+            side_effect=lambda url, data: ElementTree.fromstring(data))
+        for patcher in (get_feed, put_feed):
+            self.addCleanup(patcher.stop)
+        return get_feed.start(), put_feed.start()
+
+    def test_insert_rows(self):
+        self.mock_resize()
+        old_rows = {1: ["h1", "h2"], 2: ["a", "b"], 3: ["a", "c"]}
+        feed = self.cell_feed()
+        for row in range(2, 12):
+            for col in range(1, 11):
+                values = old_rows.get(row, [])
+                feed.add_entry(row, col,
+                               values[col - 1] if col <= len(values) else '')
+        get = self.mock_stream(feed)
+
+        post_cells = self.mock_batch()
+        result = self.sheet.insert_rows([["x", "b"]], index=2, batch_size=3)
+
+        self.assertEqual(self.sheet.row_count, 11)
+        self.assertIn('range=A2%3AJ11', get.call_args[0][0])
+        self.assertEqual(post_cells.call_count, 2)
+        self.assertEqual(
+            [(c.row, c.col, c.value) for c in result.succeeded],
+            [(2, 1, "x"), (3, 2, "b"), (4, 1, "a"), (4, 2, "c")])
+
+    def test_insert_rows_formula(self):
+        self.mock_resize()
+        feed = self.cell_feed()
+        feed.add_entry(2, 1, 'a')
+        feed.add_entry(3, 1, 'a', input_value='=A2')
+        for row in range(4, 12):
+            feed.add_entry(row, 1, '')
+        self.mock_stream(feed)
+
+        self.mock_batch()
+        result = self.sheet.insert_rows([["x"]], index=2)
+
+        self.assertEqual(
+            [(c.row, c.col, c.value) for c in result.succeeded],
+            [(2, 1, "x"), (3, 1, "a"), (4, 1, "a")])
+
+    def test_append_rows(self):
+        get_feed, put_feed = self.mock_resize()
+        feed = self.cell_feed()
+        for row in (11, 12):
+            for col in range(1, 13):
+                feed.add_entry(row, col, '')
+        get = self.mock_stream(feed)
+
+        post_cells = self.mock_batch()
+        result = self.sheet.append_rows([['a'] * 12, ['b', 'c']])
+
+        self.assertEqual((self.sheet.row_count, self.sheet.col_count),
+                         (12, 12))
+        self.assertEqual(get_feed.call_count, 1)
+        self.assertEqual(put_feed.call_count, 1)
+        self.assertEqual(get.call_count, 1)
+        self.assertEqual(post_cells.call_count, 1)
+        self.assertEqual([(c.row, c.col, c.value) for c in result.succeeded],
+                         [(11, col, 'a') for col in range(1, 13)] +
+                         [(12, 1, 'b'), (12, 2, 'c')])
+
+    def test_cache_etag(self):
+        get_feed, put_feed = self.mock_resize()
+        feed = self.cell_feed()
+        feed.add_rows([["a1", "b1"], ["a2"]])
+        not_modified = mock.Mock(status_code=304, headers={})
+        get = self.mock_stream(feed)
+        get.side_effect = [stream_response(feed, etag='W/"1"'),
+                           not_modified, not_modified]
+
+        self.sheet.enable_cache()
+        self.assertEqual(self.sheet.get_all_values(), [["a1", "b1"],
+                                                       ["a2", ""]])
+        self.assertEqual(self.sheet.find("b1").col, 2)
+        self.assertEqual(self.sheet.row_values(2), ["a2"] + [""] * 9)
+
+        self.assertEqual(get.call_count, 3)
+        self.assertEqual(get_feed.call_count, 1)
+        for call in get.call_args_list[1:]:
+            self.assertEqual(call[1]['headers']['If-None-Match'], 'W/"1"')
+
+    def test_cache_updated(self):
+        get_feed, put_feed = self.mock_resize()
+        get = self.mock_cells([["a1", "b1"]])
+
+        self.sheet.enable_cache()
+        self.sheet.get_all_values()
+        self.sheet.get_all_values()
+        self.assertEqual(get.call_count, 1)
+        self.assertEqual(get_feed.call_count, 2)
+
+        self.sheet.resize(rows=5)
+        get.return_value = stream_response(self.cell_feed())
+        self.assertEqual(self.sheet.get_all_values(), [])
+        self.assertEqual(get.call_count, 2)
+
+    def test_cache_returns_copies(self):
+        self.mock_resize()
+        self.mock_cells([["a1", "b1"]])
+
+        self.sheet.enable_cache()
+        cell = self.sheet.find("a1")
+        cell.value = "changed"
+        self.sheet.findall("b1")[0].value = "changed"
+        self.sheet.build_index().find("a1").value = "changed"
+
+        with mock.patch('gspread.models.copy') as copy:
+            self.assertEqual(self.sheet.get_all_values(), [["a1", "b1"]])
+        self.assertFalse(copy.called)
+        self.assertFalse(self.sheet.find("a1") is cell)
+
+    def test_index(self):
+        get = self.mock_cells([["key", "value"],
+                               ["apple", "1"],
+                               ["apricot", "2"],
+                               ["banana", "apple"]])
+        index = self.sheet.build_index(columns=[1])
+        self.assertEqual(get.call_count, 1)
+
+        self.assertEqual(_position(index.find("apple")), (2, 1))
+        self.assertEqual(index.findall("apple"), [index.find("apple")])
+        self.assertEqual([_position(c) for c in index.find_prefix("ap")],
+                         [(2, 1), (3, 1)])
+        self.assertRaises(gspread.CellNotFound, index.find, "1")
+
+        cell = index.find("banana")
+        cell.value = "apple"
+        index.update([cell])
+        self.assertEqual([_position(c) for c in index.findall("apple")],
+                         [(2, 1), (4, 1)])
+        self.assertFalse("banana" in index)
+        self.assertEqual(get.call_count, 1)
+
+    def test_get_all_values_bounds(self):
+        feed = self.cell_feed()
+        feed.add_entry(2, 3, 'c2')
+        feed.add_entry(3, 2, 'b3')
+        get = self.mock_stream(feed)
+
+        values = self.sheet.get_all_values(min_row=2, max_row=3,
+                                           min_col=2, max_col=3)
+        self.assertEqual(values, [['', 'c2'], ['b3', '']])
+        self.assertTrue('min-row=2' in get.call_args[0][0])
+        self.assertTrue('max-col=3' in get.call_args[0][0])
+
+    def test_find_in_column(self):
+        feed = self.cell_feed()
+        feed.add_entry(4, 2, 'needle')
+        get = self.mock_stream(feed)
+
+        cell = self.sheet.find('needle', in_column=2)
+        self.assertEqual(_position(cell), (4, 2))
+        url = get.call_args[0][0]
+        self.assertTrue('min-col=2' in url and 'max-col=2' in url)
+        self.assertFalse('min-row' in url)
+
+    def test_cache_bounds(self):
+        self.mock_resize()
+        get = self.mock_cells([["a1", "b1"], ["a2", "b2"]])
+
+        self.sheet.enable_cache()
+        self.assertEqual(self.sheet.get_all_values(min_col=2),
+                         [["b1"], ["b2"]])
+        self.assertEqual(_position(self.sheet.find("a2", in_row=2)), (2, 1))
+        self.assertEqual(get.call_count, 1)
+
+    def test_get_all_values_all_sheets(self):
+        updated = datetime.now()
+        ws_feed = test_utils.WorksheetFeed(
+            updated, 'First Last', 'real_email@gmail.com', '0123456789ABCDEF',
+            'This is a spreadsheet title')
+        for n in range(3):
+            ws_feed.add_entry('WSKEY%s' % n, 'WS %s' % n, n, 'avkey', 10, 10,
+                              updated)
+        feed = self.cell_feed()
+        feed.add_rows([["a1", "b1"], ["a2"]])
+
+        with mock.patch.object(self.gc, 'get_worksheets_feed',
+                               return_value=ws_feed.to_xml()):
+            sh = self.gc.open('This is a spreadsheet title')
+            with mock.patch.object(
+                    self.gc.session, 'get',
+                    side_effect=lambda *a, **kw: stream_response(feed)) as get:
+                values = sh.get_all_values_all_sheets(workers=3)
+
+        self.assertEqual(values, dict(('WS %s' % n, [["a1", "b1"], ["a2", ""]])
+                                      for n in range(3)))
+        self.assertEqual(get.call_count, 3)
+        self.assertEqual(sh.map(lambda wks: wks.col_count, workers=2),
+                         {'WS 0': 10, 'WS 1': 10, 'WS 2': 10})
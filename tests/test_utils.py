@@ -241,3 +241,171 @@ class WorksheetFeed(object):
             'num_results': len(self.entries),
             'entries': '\n\n'.join(entry_strs),
         })
+
+
+class CellFeed(object):
+    """A helper class for constructing XML cells feed responses.
+
+    :param updated_dt: The datetime at which there was an update to some
+        element of the worksheet.
+    :param key: The unique spreadsheet key consisting of 44 Base64 characters.
+    :param ws_key: The worksheet identifier consisting of 7 Base64
+        characters.
+    :param ws_title: The worksheet title.
+    """
+
+    CELL_FEED = dedent("""
+    <?xml version="1.0" encoding="UTF-8"?>
+    <ns0:feed xmlns:ns0="http://www.w3.org/2005/Atom" xmlns:ns1="http://a9.com/-/spec/opensearchrss/1.0/" xmlns:ns2="http://schemas.google.com/spreadsheets/2006" xmlns:ns3="http://schemas.google.com/gdata/batch">
+      <ns0:id>https://spreadsheets.google.com/feeds/cells/{key}/{ws_key}/private/full</ns0:id>
+      <ns0:updated>{updated}</ns0:updated>
+      <ns0:category scheme="http://schemas.google.com/spreadsheets/2006" term="http://schemas.google.com/spreadsheets/2006#cell" />
+      <ns0:title type="text">{ws_title}</ns0:title>
+      <ns0:link href="https://spreadsheets.google.com/feeds/cells/{key}/{ws_key}/private/full" rel="http://schemas.google.com/g/2005#feed" type="application/atom+xml" />
+      <ns0:link href="https://spreadsheets.google.com/feeds/cells/{key}/{ws_key}/private/full/batch" rel="http://schemas.google.com/g/2005#batch" type="application/atom+xml" />
+      <ns0:link href="https://spreadsheets.google.com/feeds/cells/{key}/{ws_key}/private/full" rel="self" type="application/atom+xml" />
+      <ns1:totalResults>{num_results}</ns1:totalResults>
+      <ns1:startIndex>1</ns1:startIndex>
+
+      {entries}
+
+    </ns0:feed>
+    """).strip('\n')
+
+    ENTRY = dedent("""
+      <ns0:entry>
+        <ns0:id>https://spreadsheets.google.com/feeds/cells/{key}/{ws_key}/private/full/R{row}C{col}</ns0:id>
+        <ns0:updated>{updated}</ns0:updated>
+        <ns0:category scheme="http://schemas.google.com/spreadsheets/2006" term="http://schemas.google.com/spreadsheets/2006#cell" />
+        <ns0:title type="text">{label}</ns0:title>
+        <ns0:content type="text">{value}</ns0:content>
+        <ns0:link href="https://spreadsheets.google.com/feeds/cells/{key}/{ws_key}/private/full/R{row}C{col}" rel="self" type="application/atom+xml" />
+        <ns0:link href="https://spreadsheets.google.com/feeds/cells/{key}/{ws_key}/private/full/R{row}C{col}{version}" rel="edit" type="application/atom+xml" />
+        <ns2:cell col="{col}" inputValue="{input_value}" {numeric}row="{row}">{value}</ns2:cell>
+      </ns0:entry>
+    """).strip('\n')
+
+    def __init__(self, updated_dt, key, ws_key, ws_title):
+        self.updated = to_rfc3339(updated_dt)
+        self.key = key
+        self.ws_key = ws_key
+        self.ws_title = ws_title
+        self.entries = []
+
+    def add_entry(self, row, col, value, input_value=None,
+                  numeric_value=None, version='1ijmb0'):
+        """Adds a cell entry to the feed.
+
+        :param row: The row number of the cell.
+        :param col: The column number of the cell.
+        :param value: The displayed value of the cell.
+        :param input_value: The value as entered by the user, e.g. a
+            formula. Defaults to `value`.
+        :param numeric_value: The numeric value of the cell, if any.
+        :param version: The cell version identifier, or None for a
+            GData 3.0 entry whose edit link ends with the cell id.
+        """
+        label = ''
+        div = col
+        while div:
+            (div, mod) = divmod(div - 1, 26)
+            label = chr(mod + 65) + label
+
+        if numeric_value is not None:
+            numeric = 'numericValue="%s" ' % numeric_value
+        else:
+            numeric = ''
+
+        self.entries.append({
+            'key': self.key,
+            'ws_key': self.ws_key,
+            'row': row,
+            'col': col,
+            'label': '%s%s' % (label, row),
+            'value': value,
+            'input_value': value if input_value is None else input_value,
+            'numeric': numeric,
+            'version': '/%s' % version if version else '',
+            'updated': self.updated,
+        })
+
+    def add_rows(self, rows):
+        """Adds entries for all non-empty values of a list of lists.
+
+        Numbers are added as cells with a numeric value.
+        """
+        for row, values in enumerate(rows, start=1):
+            for col, value in enumerate(values, start=1):
+                if isinstance(value, (int, float)):
+                    self.add_entry(row, col, str(value), numeric_value=value)
+                elif value != '':
+                    self.add_entry(row, col, value)
+
+    def to_xml(self):
+        return ElementTree.fromstring(str(self))
+
+    def __str__(self):
+        entry_strs = [self.ENTRY.format(**entry_dict)
+                      for entry_dict in self.entries]
+        return self.CELL_FEED.format(**{
+            'updated': self.updated,
+            'key': self.key,
+            'ws_key': self.ws_key,
+            'ws_title': self.ws_title,
+            'num_results': len(self.entries),
+            'entries': '\n\n'.join(entry_strs),
+        })
+
+
+def batch_response(data, failed=()):
+    """Builds a cells batch response for the batch request `data`.
+
+    :param data: The XML batch request feed.
+    :param failed: Batch ids of the entries to be reported as failed.
+    """
+    feed = ElementTree.fromstring(data)
+    for entry in feed.findall('{http://www.w3.org/2005/Atom}entry'):
+        batch_id = entry.find('{http://schemas.google.com/gdata/batch}id')
+        if batch_id.text in failed:
+            status = {'code': '403', 'reason': 'Forbidden'}
+        else:
+            status = {'code': '200', 'reason': 'Success'}
+        ElementTree.SubElement(
+            entry, '{http://schemas.google.com/gdata/batch}status', status)
+    return feed
+
+
+def batch_query_response(cell_feed, data, values):
+    """Builds a cells batch response for the batch query request `data`.
+
+    :param cell_feed: An empty :class:`CellFeed` for the worksheet.
+    :param data: The XML batch request feed.
+    :param values: A dict mapping (row, col) tuples to cell values. Cells
+        that aren't in it are reported as not found.
+    """
+    batch_ns = '{http://schemas.google.com/gdata/batch}'
+    request = ElementTree.fromstring(data)
+    batch_ids = [entry.find(batch_ns + 'id').text for entry in
+                 request.findall('{http://www.w3.org/2005/Atom}entry')]
+
+    found = []
+    for batch_id in batch_ids:
+        row, col = map(int, batch_id[1:].split('C'))
+        if (row, col) in values:
+            cell_feed.add_entry(row, col, values[(row, col)])
+            found.append(batch_id)
+
+    feed = cell_feed.to_xml()
+    for batch_id, entry in zip(found, feed.findall(
+            '{http://www.w3.org/2005/Atom}entry')):
+        ElementTree.SubElement(entry, batch_ns + 'id').text = batch_id
+        ElementTree.SubElement(entry, batch_ns + 'status',
+                               {'code': '200', 'reason': 'Success'})
+    for batch_id in batch_ids:
+        if batch_id not in found:
+            entry = ElementTree.SubElement(
+                feed, '{http://www.w3.org/2005/Atom}entry')
+            ElementTree.SubElement(entry, batch_ns + 'id').text = batch_id
+            ElementTree.SubElement(entry, batch_ns + 'status',
+                                   {'code': '404', 'reason': 'Not Found'})
+    return feed